@@ -0,0 +1,190 @@
+"""Fixtures for the benchmarks.
+
+Run them with `tox -e benchmark,benchmark-simplejson` or `pytest benchmarks`,
+peak memory of a single run of every benchmark is reported at the end.
+"""
+
+import datetime
+import random
+import tracemalloc
+import uuid
+from collections import namedtuple
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import List
+
+import attr
+import pytest
+
+from kw.json._compat import simplejson_available
+
+try:
+    import pytest_benchmark  # noqa pylint: disable=unused-import
+except ImportError:
+    # Don't fail a plain `pytest` run without the plugin installed
+    collect_ignore_glob = ["test_*.py"]
+
+PEAK_MEMORY = {}
+
+random.seed(42)
+
+
+@dataclass
+class Segment:
+    origin: str
+    destination: str
+    departure: datetime.datetime
+    arrival: datetime.datetime
+    carrier: str
+    price: float
+
+
+@dataclass
+class Itinerary:
+    id: uuid.UUID
+    segments: List[Segment] = field(default_factory=list)
+    total: Decimal = Decimal("0")
+
+
+@attr.s
+class Passenger:
+    first_name = attr.ib(type=str)
+    last_name = attr.ib(type=str)
+    birthday = attr.ib(type=datetime.date)
+
+
+Fare = namedtuple("Fare", ["id", "price", "tax", "currency"])
+
+
+def make_segment(i):
+    departure = datetime.datetime(2018, 1, 1, 6) + datetime.timedelta(hours=i)
+    return Segment(
+        origin="PRG",
+        destination="BCN",
+        departure=departure,
+        arrival=departure + datetime.timedelta(hours=2, minutes=35),
+        carrier="FR",
+        price=random.random() * 100,
+    )
+
+
+@pytest.fixture(scope="session")
+def nested_dicts():
+    return [
+        {
+            "id": i,
+            "booking_token": "x" * 40,
+            "price": {"amount": random.random() * 1000, "currency": "EUR"},
+            "route": [
+                {
+                    "from": "PRG",
+                    "to": "BCN",
+                    "flight_no": 1234,
+                    "price": random.random(),
+                }
+                for _ in range(3)
+            ],
+            "passengers": [{"name": "John", "age": 30, "bags": [1, 2]}],
+            "available": True,
+            "note": None,
+        }
+        for i in range(2000)
+    ]
+
+
+@pytest.fixture(scope="session")
+def dataclasses():
+    return [
+        Itinerary(
+            id=uuid.uuid4(),
+            segments=[make_segment(i + j) for j in range(3)],
+            total=Decimal("123.45"),
+        )
+        for i in range(1000)
+    ]
+
+
+@pytest.fixture(scope="session")
+def attrs_items():
+    return [
+        Passenger("John", "Doe", datetime.date(1990, 1, 1) + datetime.timedelta(days=i))
+        for i in range(5000)
+    ]
+
+
+@pytest.fixture(scope="session")
+def datetimes():
+    start = datetime.datetime(2018, 1, 1)
+    return [start + datetime.timedelta(minutes=i) for i in range(10000)]
+
+
+@pytest.fixture(scope="session")
+def schedule():
+    """Flight schedule, where the same departure times repeat a lot."""
+    departures = [
+        datetime.datetime(2018, 1, 1, hour, minute, tzinfo=datetime.timezone.utc)
+        for hour in range(24)
+        for minute in (0, 15, 30, 45)
+    ]
+    return [{"flight": i, "departure": departures[i % 96]} for i in range(10000)]
+
+
+@pytest.fixture(scope="session")
+def decimals():
+    return [Decimal(i) / 100 for i in range(10000)]
+
+
+@pytest.fixture(scope="session")
+def namedtuples():
+    return [Fare(i, i * 1.23456, i * 0.23456, "EUR") for i in range(10000)]
+
+
+@pytest.fixture(scope="session")
+def floats():
+    return [
+        {"price": random.random() * 1000, "legs": [random.random()] * 5}
+        for _ in range(5000)
+    ]
+
+
+@pytest.fixture(scope="session")
+def masking_payload():
+    """Request log with many distinct keys, some of them to be masked."""
+    keys = [f"field_{i}" for i in range(200)] + [
+        "password",
+        "api_key",
+        "booking_token",
+        "access_token",
+        "Secret",
+    ]
+    return [{key: {"value": key, "token": i} for key in keys} for i in range(50)]
+
+
+@pytest.fixture
+def bench(benchmark, request):
+    """Benchmark the given function and measure its peak memory on a single run."""
+
+    def run(func, *args, **kwargs):
+        benchmark.group = request.node.originalname
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory"] = peak
+        benchmark.extra_info["simplejson"] = simplejson_available
+        PEAK_MEMORY[request.node.nodeid] = peak
+        return benchmark(func, *args, **kwargs)
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not PEAK_MEMORY:
+        return
+    backend = "simplejson" if simplejson_available else "json"
+    terminalreporter.section(f"peak memory ({backend})")
+    width = max(len(name) for name in PEAK_MEMORY)
+    for name, peak in sorted(PEAK_MEMORY.items()):
+        terminalreporter.write_line(f"{name:<{width}} {peak / 1024:>10.1f} KiB")
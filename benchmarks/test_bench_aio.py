@@ -0,0 +1,35 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from kw.json import adumps
+from kw.json.aio import is_large
+
+
+@pytest.fixture(scope="module")
+def process_pool():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+
+@pytest.fixture(scope="module")
+def thread_pool():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield executor
+
+
+def test_is_large(bench, nested_dicts):
+    bench(is_large, nested_dicts)
+
+
+def test_adumps_inline(bench, nested_dicts):
+    bench(lambda: asyncio.run(adumps(nested_dicts, threshold=None)))
+
+
+def test_adumps_thread_pool(bench, nested_dicts, thread_pool):
+    bench(lambda: asyncio.run(adumps(nested_dicts, executor=thread_pool)))
+
+
+def test_adumps_process_pool(bench, nested_dicts, process_pool):
+    bench(lambda: asyncio.run(adumps(nested_dicts, executor=process_pool)))
@@ -0,0 +1,30 @@
+import datetime
+import uuid
+from decimal import Decimal
+from typing import List
+
+import pytest
+
+from kw.json import Decoder, dumps, loads
+
+
+@pytest.fixture(scope="session")
+def itineraries_json(dataclasses):
+    return dumps(dataclasses)
+
+
+def test_loads(bench, itineraries_json):
+    bench(loads, itineraries_json)
+
+
+def test_loads_schema(bench, dataclasses, itineraries_json):
+    decoder = Decoder(List[type(dataclasses[0])])
+    bench(decoder.loads, itineraries_json)
+
+
+def test_loads_converters(bench, itineraries_json):
+    decoder = Decoder(
+        converters={"id": uuid.UUID, "total": Decimal},
+        patterns={"^(departure|arrival)$": datetime.datetime},
+    )
+    bench(decoder.loads, itineraries_json)
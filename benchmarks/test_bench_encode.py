@@ -0,0 +1,133 @@
+import calendar
+import collections
+
+import pytest
+
+from kw.json import dumps, dumps_bytes, encode, iterdumps, loads
+from kw.json._compat import get_orjson
+from kw.json.dates import unix_time
+from kw.json.encode import default_encoder, format_value
+
+orjson = get_orjson()
+
+BACKENDS = [
+    "json",
+    pytest.param(
+        "orjson",
+        marks=pytest.mark.skipif(orjson is None, reason="orjson is not installed"),
+    ),
+]
+PAYLOADS = [
+    "nested_dicts",
+    "dataclasses",
+    "attrs_items",
+    "datetimes",
+    "decimals",
+    "namedtuples",
+]
+
+
+@pytest.mark.parametrize(
+    "payload", ["dataclasses", "attrs_items", "datetimes", "decimals"]
+)
+def test_default_encoder(bench, request, payload):
+    items = request.getfixturevalue(payload)
+    bench(lambda: [default_encoder(item) for item in items])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_dumps(bench, request, payload, backend):
+    value = request.getfixturevalue(payload)
+    bench(dumps, value, backend=backend)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_dumps_date_as_unix_time(bench, datetimes, backend):
+    bench(dumps, datetimes, date_as_unix_time=True, backend=backend)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_dumps_precision(bench, floats, backend):
+    bench(dumps, floats, precision=2, backend=backend)
+
+
+@pytest.mark.parametrize("payload", ["floats", "nested_dicts", "masking_payload"])
+def test_dumps_precision_payloads(bench, request, payload):
+    bench(dumps, request.getfixturevalue(payload), precision=2)
+
+
+@pytest.mark.parametrize("payload", ["floats", "nested_dicts", "masking_payload"])
+def test_format_value_dumps(bench, request, payload):
+    """The previous way of rounding floats, copying the data upfront, to compare with."""
+    value = request.getfixturevalue(payload)
+    bench(lambda: dumps(format_value(value, 2)))
+
+
+def test_iterdumps(bench, nested_dicts):
+    bench(lambda: sum(len(chunk) for chunk in iterdumps(nested_dicts)))
+
+
+def test_format_value_namedtuples(bench, namedtuples, monkeypatch):
+    created = []
+
+    def counting_namedtuple(*args, **kwargs):
+        created.append(args)
+        return collections.namedtuple(*args, **kwargs)
+
+    monkeypatch.setattr(encode, "namedtuple", counting_namedtuple)
+    bench(format_value, namedtuples, 2)
+    assert not created
+
+
+@pytest.mark.parametrize("shallow", [False, True])
+def test_dumps_shallow(bench, dataclasses, shallow):
+    bench(dumps, dataclasses, shallow=shallow)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"utc_suffix": "Z", "timespec": "milliseconds"},
+        {"date_as_unix_time": True, "timespec": "milliseconds"},
+    ],
+    ids=["isoformat", "utc_suffix", "unix_time_ms"],
+)
+@pytest.mark.parametrize("payload", ["datetimes", "schedule"])
+def test_dumps_date_options(bench, request, payload, options):
+    bench(dumps, request.getfixturevalue(payload), **options)
+
+
+def test_timegm(bench, datetimes):
+    """The previous way of encoding `date_as_unix_time`, to compare with."""
+    bench(lambda: [calendar.timegm(value.timetuple()) for value in datetimes])
+
+
+def test_unix_time(bench, datetimes):
+    bench(lambda: [unix_time(value) for value in datetimes])
+
+
+def test_dumps_use_decimal(bench, decimals):
+    bench(dumps, decimals, use_decimal=True)
+
+
+def test_loads_use_decimal(bench, decimals):
+    bench(loads, dumps(decimals, use_decimal=True), use_decimal=True)
+
+
+def test_dumps_encode(bench, nested_dicts):
+    """Encoding the output of `dumps` to bytes, to compare with."""
+    bench(lambda: dumps(nested_dicts).encode("utf-8"))
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_dumps_bytes(bench, nested_dicts, backend):
+    if backend == "orjson" and orjson is None:
+        pytest.skip("orjson is not installed")
+    bench(dumps_bytes, nested_dicts, backend=backend)
+
+
+def test_dumps_bytes_buffer(bench, nested_dicts):
+    buffer = bytearray()
+    bench(dumps_bytes, nested_dicts, buffer)
@@ -0,0 +1,25 @@
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from kw.json.flask import JSONExtension
+
+
+def make_app(provider):
+    app = Flask(__name__)
+    if provider == "flask":
+        app.json = DefaultJSONProvider(app)
+    elif provider == "kiwi":
+        JSONExtension(app)
+    else:
+        JSONExtension(app, stream_threshold=1)
+    return app
+
+
+@pytest.mark.parametrize("provider", ["flask", "kiwi", "kiwi-streamed"])
+@pytest.mark.parametrize("payload", ["nested_dicts", "dataclasses"])
+def test_jsonify(bench, request, provider, payload):
+    data = request.getfixturevalue(payload)
+    app = make_app(provider)
+    with app.app_context():
+        bench(lambda: app.json.response(data).get_data())
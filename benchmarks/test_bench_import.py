@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(statement):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    subprocess.run([sys.executable, "-c", statement], check=True, env=env)
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "pass",
+        "import kw.json",
+        "from kw.json import dumps",
+        "from kw.json import dumps; dumps({})",
+        "from kw.json import dumps; dumps({}, backend='orjson')",
+    ],
+)
+def test_import(benchmark, statement):
+    """Cold start of a new interpreter, `pass` is the baseline."""
+    benchmark.group = "import"
+    benchmark.pedantic(run, args=(statement,), rounds=20)
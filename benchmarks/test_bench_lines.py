@@ -0,0 +1,13 @@
+from kw.json import dumps, dumps_lines
+
+
+def test_dumps_per_record(bench, nested_dicts):
+    bench(lambda: "".join(dumps(record) + "\n" for record in nested_dicts))
+
+
+def test_dumps_lines(bench, nested_dicts):
+    bench(dumps_lines, nested_dicts)
+
+
+def test_dumps_lines_workers(bench, nested_dicts):
+    bench(dumps_lines, nested_dicts, workers=2, batch_size=500)
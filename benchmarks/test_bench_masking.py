@@ -0,0 +1,37 @@
+import pytest
+
+from kw.json import MaskedJSONEncoder, dumps, mask_dict, mask_dict_factory
+
+
+@pytest.mark.parametrize("cache_size", [0, 4096])
+def test_mask_dict(bench, masking_payload, cache_size):
+    mask_dict = mask_dict_factory(cache_size=cache_size)
+    bench(lambda: [mask_dict(item) for item in masking_payload])
+
+
+@pytest.mark.parametrize("recursive", [False, True])
+def test_dumps_masked(bench, masking_payload, recursive):
+    bench(
+        lambda: [
+            dumps(item, cls=MaskedJSONEncoder, recursive=recursive)
+            for item in masking_payload
+        ]
+    )
+
+
+@pytest.mark.parametrize("shallow", [False, True])
+def test_dumps_masked_dataclasses(bench, dataclasses, shallow):
+    bench(dumps, dataclasses, cls=MaskedJSONEncoder, shallow=shallow)
+
+
+def test_dumps_masked_copy(bench, masking_payload):
+    """Masking a deep copy of the data upfront, to compare with `recursive=True`."""
+
+    def mask(value):
+        if isinstance(value, dict):
+            return mask_dict({key: mask(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return [mask(item) for item in value]
+        return value
+
+    bench(lambda: [dumps(mask(item)) for item in masking_payload])
@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+from kw.json import dumps
+
+
+# Scaling is bounded by the cores available, see `os.cpu_count()`
+@pytest.mark.parametrize("workers", (None, 1, 2, 4, 8))
+def test_dumps_workers(bench, dataclasses, workers):
+    if workers and workers > 2 * (os.cpu_count() or 1):
+        pytest.skip("More workers than twice the cores")
+    bench(dumps, dataclasses, workers=workers)
@@ -0,0 +1,18 @@
+import pytest
+
+from kw.json import dumps, loads
+
+
+@pytest.fixture(scope="session")
+def response(nested_dicts):
+    """Multi-megabyte partner response."""
+    return dumps({"data": nested_dicts * 5, "meta": {"count": len(nested_dicts) * 5}})
+
+
+def test_loads_whole_document(bench, response):
+    bench(loads, response)
+
+
+@pytest.mark.parametrize("select", (["meta.count"], ["data.*.price.amount"]))
+def test_loads_select(bench, response, select):
+    bench(loads, response, select=select)
@@ -0,0 +1,39 @@
+import pytest
+
+from kw.json import dumps, encode_rows
+
+
+class Record:
+    """Stand-in for `asyncpg.Record`."""
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys, values):
+        self._keys = keys
+        self._values = values
+
+    def keys(self):
+        return iter(self._keys)
+
+    def __getitem__(self, key):
+        return self._values[self._keys.index(key)]
+
+    def __iter__(self):
+        return iter(self._values)
+
+
+@pytest.fixture(scope="session")
+def records():
+    keys = ("id", "origin", "destination", "price", "carrier", "seats")
+    return [
+        Record(keys, (i, "PRG", "BCN", i * 1.5, "FR", i % 180)) for i in range(100000)
+    ]
+
+
+def test_dumps_records(bench, records):
+    bench(dumps, records)
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_dumps_encode_rows(bench, records, columnar):
+    bench(lambda: dumps(encode_rows(records, columnar=columnar)))
@@ -0,0 +1,13 @@
+import pytest
+from starlette.responses import JSONResponse
+
+from kw.json import KiwiJSONResponse
+
+
+@pytest.mark.parametrize("response_class", [JSONResponse, KiwiJSONResponse])
+def test_render(bench, nested_dicts, response_class):
+    bench(response_class, nested_dicts)
+
+
+def test_render_dataclasses(bench, dataclasses):
+    bench(KiwiJSONResponse, dataclasses)
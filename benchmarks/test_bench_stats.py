@@ -0,0 +1,12 @@
+import pytest
+
+from kw.json import collect_stats, dumps
+
+
+@pytest.mark.parametrize("collected", [False, True])
+def test_dumps_dataclasses_stats(bench, dataclasses, collected):
+    if not collected:
+        bench(dumps, dataclasses, shallow=True)
+        return
+    with collect_stats():
+        bench(dumps, dataclasses, shallow=True)
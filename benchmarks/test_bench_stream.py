@@ -0,0 +1,20 @@
+import io
+
+import pytest
+
+from kw.json import dumps, iterload, load
+
+
+@pytest.fixture(scope="session")
+def dump(nested_dicts):
+    """Multi-megabyte export with one large array."""
+    document = {"meta": {"count": len(nested_dicts) * 5}, "items": nested_dicts * 5}
+    return dumps(document).encode()
+
+
+def test_load_whole_dump(bench, dump):
+    bench(lambda: load(io.BytesIO(dump))["items"])
+
+
+def test_iterload_items(bench, dump):
+    bench(lambda: sum(1 for _ in iterload(io.BytesIO(dump), "items.item")))
@@ -1,20 +1,91 @@
-from __future__ import absolute_import
+from importlib import import_module
 
-from ._compat import _load as load
-from ._compat import _loads as loads
-from .encode import (
-    KiwiJSONEncoder,
-    MaskedJSONEncoder,
-    default_encoder,
-    dump,
-    dumps,
-    raw_encoder,
-)
-from .flask import JSONExtension
-from .utils import (
-    DEFAULT_BLACKLIST,
-    DEFAULT_PLACEHOLDER,
-    DEFAULT_WHITELIST,
-    mask_dict,
-    mask_dict_factory,
-)
+# Importing `typing` just for this would be slow, static analysis takes this as well
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from ._compat import set_backend
+    from .aio import adump, adumps
+    from .decode import Decoder, iterload, load, loads, register_decoder
+    from .encode import (
+        Encoder,
+        KiwiJSONEncoder,
+        MaskedJSONEncoder,
+        default_encoder,
+        dump,
+        dumps,
+        dumps_bytes,
+        iterdumps,
+        raw_encoder,
+        register_encoder,
+        register_fields,
+    )
+    from .flask import JSONExtension
+    from .lines import dump_lines, dumps_lines, iterdumps_lines, load_lines
+    from .rows import encode_rows
+    from .starlette import KiwiJSONResponse, KiwiJSONStreamingResponse
+    from .stats import collect_stats, disable_stats, enable_stats, get_stats
+    from .utils import (
+        DEFAULT_BLACKLIST,
+        DEFAULT_PLACEHOLDER,
+        DEFAULT_WHITELIST,
+        mask_dict,
+        mask_dict_factory,
+    )
+
+# Attributes are imported on first access, so `import kw.json` doesn't import
+# the JSON backend, attrs, dataclasses or Flask before they are needed.
+_LAZY_ATTRIBUTES = {
+    "set_backend": ("._compat", "set_backend"),
+    "adump": (".aio", "adump"),
+    "adumps": (".aio", "adumps"),
+    "Decoder": (".decode", "Decoder"),
+    "iterload": (".decode", "iterload"),
+    "load": (".decode", "load"),
+    "loads": (".decode", "loads"),
+    "register_decoder": (".decode", "register_decoder"),
+    "Encoder": (".encode", "Encoder"),
+    "KiwiJSONEncoder": (".encode", "KiwiJSONEncoder"),
+    "MaskedJSONEncoder": (".encode", "MaskedJSONEncoder"),
+    "default_encoder": (".encode", "default_encoder"),
+    "dump": (".encode", "dump"),
+    "dumps": (".encode", "dumps"),
+    "dumps_bytes": (".encode", "dumps_bytes"),
+    "iterdumps": (".encode", "iterdumps"),
+    "raw_encoder": (".encode", "raw_encoder"),
+    "register_encoder": (".encode", "register_encoder"),
+    "register_fields": (".encode", "register_fields"),
+    "JSONExtension": (".flask", "JSONExtension"),
+    "dump_lines": (".lines", "dump_lines"),
+    "dumps_lines": (".lines", "dumps_lines"),
+    "iterdumps_lines": (".lines", "iterdumps_lines"),
+    "load_lines": (".lines", "load_lines"),
+    "encode_rows": (".rows", "encode_rows"),
+    "KiwiJSONResponse": (".starlette", "KiwiJSONResponse"),
+    "KiwiJSONStreamingResponse": (".starlette", "KiwiJSONStreamingResponse"),
+    "collect_stats": (".stats", "collect_stats"),
+    "disable_stats": (".stats", "disable_stats"),
+    "enable_stats": (".stats", "enable_stats"),
+    "get_stats": (".stats", "get_stats"),
+    "DEFAULT_BLACKLIST": (".utils", "DEFAULT_BLACKLIST"),
+    "DEFAULT_PLACEHOLDER": (".utils", "DEFAULT_PLACEHOLDER"),
+    "DEFAULT_WHITELIST": (".utils", "DEFAULT_WHITELIST"),
+    "mask_dict": (".utils", "mask_dict"),
+    "mask_dict_factory": (".utils", "mask_dict_factory"),
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    try:
+        module, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module, __name__), attribute)
+    # Cached, so it's looked up only once
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -1,3 +1,6 @@
+from decimal import Decimal
+from functools import wraps
+
 try:
     import enum  # pylint: disable=W0611
 except ImportError:
@@ -6,36 +9,86 @@ except ImportError:
 try:
     from simplejson.encoder import (  # pylint: disable=W0611
         JSONEncoder as BaseJSONEncoder,
+        encode_basestring,
+        encode_basestring_ascii,
     )
+    from simplejson import JSONDecoder, JSONDecodeError  # pylint: disable=W0611
+    from simplejson.decoder import scanstring  # pylint: disable=W0611
     from simplejson import dumps as json_dumps  # pylint: disable=W0611
     from simplejson import dump as json_dump  # pylint: disable=W0611
     from simplejson import loads as json_loads  # pylint: disable=W0611
     from simplejson import load as json_load  # pylint: disable=W0611
 
+    c_make_encoder = None
     simplejson_available = True
 except ImportError:
-    from json.encoder import JSONEncoder as BaseJSONEncoder  # pylint: disable=W0611
+    from json.encoder import (  # pylint: disable=W0611
+        JSONEncoder as BaseJSONEncoder,
+        c_make_encoder,
+        encode_basestring,
+        encode_basestring_ascii,
+    )
+    from json import JSONDecoder, JSONDecodeError  # pylint: disable=W0611
+    from json.decoder import scanstring  # pylint: disable=W0611
     from json import dumps as json_dumps  # pylint: disable=W0611
     from json import dump as json_dump  # pylint: disable=W0611
     from json import loads as json_loads  # pylint: disable=W0611
     from json import load as json_load  # pylint: disable=W0611
 
     simplejson_available = False
+
 from .exceptions import KiwiJsonError
 
-from dataclasses import dataclass
+_orjson = False  # Not imported yet
+
+
+def get_orjson():
+    """Return the orjson module, None if it isn't installed. It's imported on first use."""
+    global _orjson  # pylint: disable=global-statement
+    if _orjson is False:
+        try:
+            import orjson  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            orjson = None
+        _orjson = orjson
+    return _orjson
+
+
+BACKENDS = ("json", "orjson")
+_default_backend = "json"
+
+
+def set_backend(name):
+    """Set the backend used by `dumps` and `dump` when none is passed explicitly.
+
+    "json" uses simplejson if installed, the standard library otherwise.
+    "orjson" uses orjson if installed and falls back to "json" otherwise.
+    """
+    global _default_backend  # pylint: disable=global-statement
+    if name not in BACKENDS:
+        raise KiwiJsonError(f"Unknown backend {name!r}, use one of {BACKENDS}")
+    _default_backend = name
+
+
+def get_backend(name=None):
+    """Return the name of the backend that is going to be used."""
+    if name is None:
+        name = _default_backend
+    elif name not in BACKENDS:
+        raise KiwiJsonError(f"Unknown backend {name!r}, use one of {BACKENDS}")
+    if name == "orjson" and get_orjson() is None:
+        return "json"
+    return name
 
 
-@dataclass
-class DataclassItem:
-    attrib: int
+USE_DECIMAL_ERROR_MESSAGE = (
+    "You can't serialise Decimal as JSON number safely with the standard 'json' module "
+    "and an encoder not derived from 'KiwiJSONEncoder'. "
+    "Use one or make sure you have 'simplejson' or similar installed."
+)
 
 
 def prevent_unexpected_argument_error(func):
-    __use_decimal_error_message = (
-        "You can't serialise Decimal as JSON number safely with the standard 'json' module. "
-        "Make sure you have 'simplejson' or similar installed."
-    )
 
     def wrapper(*args, **kwargs):
         try:
@@ -44,16 +97,53 @@ def prevent_unexpected_argument_error(func):
             if str(err).endswith(
                 "__init__() got an unexpected keyword argument 'use_decimal'"
             ):
-                raise KiwiJsonError(  # pylint: disable=W0707
-                    __use_decimal_error_message
-                )
+                raise KiwiJsonError(USE_DECIMAL_ERROR_MESSAGE)  # pylint: disable=W0707
             raise
         return result
 
     return wrapper
 
 
+def parse_decimal(func):
+    """Make `func` take `use_decimal` like simplejson, decoding floats as Decimals."""
+    if simplejson_available:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, use_decimal=False, **kwargs):
+        if use_decimal:
+            kwargs["parse_float"] = Decimal
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def make_json_decoder(cls=None, use_decimal=False, **kwargs):
+    """Return a decoder taking the `loads` keyword arguments, including `use_decimal`."""
+    if use_decimal:
+        kwargs["parse_float"] = Decimal
+    return (cls or JSONDecoder)(**kwargs)
+
+
+def make_scanner(decoder):
+    """Return a function decoding the value at an index of a string with `decoder`.
+
+    It returns the value and the index after it, errors raise `JSONDecodeError`.
+    """
+    if simplejson_available:
+        return decoder.raw_decode
+    scan_once = decoder.scan_once
+
+    def scan(s, idx):
+        try:
+            return scan_once(s, idx)
+        except StopIteration as err:
+            raise JSONDecodeError("Expecting value", s, err.value) from None
+
+    return scan
+
+
 _dumps = prevent_unexpected_argument_error(json_dumps)
 _dump = prevent_unexpected_argument_error(json_dump)
-_loads = prevent_unexpected_argument_error(json_loads)
-_load = prevent_unexpected_argument_error(json_load)
+_loads = prevent_unexpected_argument_error(parse_decimal(json_loads))
+_load = prevent_unexpected_argument_error(parse_decimal(json_load))
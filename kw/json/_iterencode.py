@@ -0,0 +1,428 @@
+"""Pure Python encoding loop with hooks the native encoders don't provide.
+
+It mirrors the pure Python implementation of `json` and `simplejson`, reading its
+configuration from the given encoder instance, so the output is the same as the one
+of the encoder itself.
+"""
+
+from collections.abc import Iterator
+from decimal import Decimal
+from operator import itemgetter
+
+from ._compat import c_make_encoder, encode_basestring, encode_basestring_ascii
+
+INFINITY = float("inf")
+
+# Set by `kw.json.stats` while collecting statistics, checked on the hot paths
+_stats = None
+
+
+def make_floatstr(allow_nan=True, ignore_nan=False, precision=None):
+    def floatstr(o, _repr=float.__repr__, _inf=INFINITY, _neginf=-INFINITY):
+        if o != o:  # pylint: disable=comparison-with-itself
+            text = "NaN"
+        elif o == _inf:
+            text = "Infinity"
+        elif o == _neginf:
+            text = "-Infinity"
+        else:
+            return _repr(o)
+
+        if ignore_nan:
+            return "null"
+        if not allow_nan:
+            raise ValueError(
+                "Out of range float values are not JSON compliant: " + repr(o)
+            )
+        return text
+
+    if precision is None:
+        return floatstr
+
+    def roundedfloatstr(o, _repr=float.__repr__, _round=round):
+        # Only finite numbers give 0
+        if o - o == 0:
+            return _repr(_round(o, precision))
+        return floatstr(o)
+
+    return roundedfloatstr
+
+
+def make_iterencode(
+    encoder,
+    *,
+    is_masked=None,
+    placeholder=None,
+    precision=None,
+    iterators=False,
+    ## HACK: hand-optimized bytecode; turn globals into locals
+    isinstance=isinstance,
+    dict=dict,
+    float=float,
+    int=int,
+    list=list,
+    str=str,
+    tuple=tuple,
+    _intstr=int.__repr__,
+):
+    """Return `_iterencode(o, level)` yielding chunks of `o` encoded by `encoder`.
+
+    If `is_masked` is given, values of dict keys it returns True for are replaced
+    with `placeholder` on every nesting level. If `precision` is given, float values
+    (not keys) are rounded to it. If `iterators` is True, iterators (e.g. generators)
+    are encoded as arrays while being consumed.
+    """
+    markers = {} if encoder.check_circular else None
+    _encoder = encode_basestring_ascii if encoder.ensure_ascii else encode_basestring
+    ignore_nan = getattr(encoder, "ignore_nan", False)
+    _floatstr = make_floatstr(encoder.allow_nan, ignore_nan, precision)
+    _keyfloatstr = make_floatstr(encoder.allow_nan, ignore_nan)
+    _default = encoder.default
+    _indent = encoder.indent
+    if _indent is not None and not isinstance(_indent, str):
+        _indent = " " * _indent
+    _key_separator = encoder.key_separator
+    _item_separator = encoder.item_separator
+    _sort_keys = encoder.sort_keys
+    _skipkeys = encoder.skipkeys
+    # simplejson-only options
+    _use_decimal = getattr(encoder, "use_decimal", False)
+    _namedtuple_as_object = getattr(encoder, "namedtuple_as_object", False)
+    _tuple_as_array = getattr(encoder, "tuple_as_array", True)
+    _iterable_as_array = getattr(encoder, "iterable_as_array", False)
+    # simplejson sorts items by their stringified keys, json by the original ones
+    _item_sort_key = getattr(encoder, "item_sort_key", None)
+    if _sort_keys and _item_sort_key is None and hasattr(encoder, "item_sort_key"):
+        _item_sort_key = itemgetter(0)
+
+    def _stringify_key(key):
+        if isinstance(key, str):
+            return key
+        if isinstance(key, float):
+            return _keyfloatstr(key)
+        if key is True:
+            return "true"
+        if key is False:
+            return "false"
+        if key is None:
+            return "null"
+        if isinstance(key, int):
+            return _intstr(key)
+        if _use_decimal and isinstance(key, Decimal):
+            return str(key)
+        if _skipkeys:
+            return None
+        raise TypeError(
+            f"keys must be str, int, float, bool or None, not {key.__class__.__name__}"
+        )
+
+    def _iterencode_list(lst, level):
+        if markers is not None:
+            markerid = id(lst)
+            if markerid in markers:
+                raise ValueError("Circular reference detected")
+            markers[markerid] = lst
+        if _indent is not None:
+            level += 1
+            newline_indent = "\n" + _indent * level
+            separator = _item_separator + newline_indent
+            buf = "[" + newline_indent
+        else:
+            newline_indent = None
+            separator = _item_separator
+            buf = "["
+        first = True
+        # Works for any iterable, the emptiness is known only after iterating it
+        for value in lst:
+            if first:
+                first = False
+            else:
+                buf = separator
+            if isinstance(value, str):
+                yield buf + _encoder(value)
+            elif value is None:
+                yield buf + "null"
+            elif value is True:
+                yield buf + "true"
+            elif value is False:
+                yield buf + "false"
+            elif isinstance(value, int):
+                yield buf + _intstr(value)
+            elif isinstance(value, float):
+                yield buf + _floatstr(value)
+            else:
+                yield buf
+                if isinstance(value, list):
+                    yield from _iterencode_list(value, level)
+                elif isinstance(value, dict):
+                    yield from _iterencode_dict(value, level)
+                else:
+                    yield from _iterencode(value, level)
+        if first:
+            yield "[]"
+        else:
+            if newline_indent is not None:
+                yield "\n" + _indent * (level - 1)
+            yield "]"
+        if markers is not None:
+            del markers[markerid]
+
+    def _iterencode_dict(dct, level):
+        if not dct:
+            yield "{}"
+            return
+        if markers is not None:
+            markerid = id(dct)
+            if markerid in markers:
+                raise ValueError("Circular reference detected")
+            markers[markerid] = dct
+        if _indent is not None:
+            level += 1
+            newline_indent = "\n" + _indent * level
+            item_separator = _item_separator + newline_indent
+            buf = "{" + newline_indent
+        else:
+            newline_indent = None
+            item_separator = _item_separator
+            buf = "{"
+        first = True
+        if _item_sort_key is not None:
+            items = []
+            for key, value in dct.items():
+                key = _stringify_key(key)
+                if key is not None:
+                    items.append((key, value))
+            items.sort(key=_item_sort_key)
+        elif _sort_keys:
+            items = sorted(dct.items())
+        else:
+            items = dct.items()
+        for key, value in items:
+            if not isinstance(key, str):
+                key = _stringify_key(key)
+                if key is None:
+                    continue
+            if first:
+                first = False
+            else:
+                buf = item_separator
+            if is_masked is not None and is_masked(key):
+                value = placeholder
+                stats = _stats
+                if stats is not None:
+                    stats.masked_keys[key] += 1
+            buf += _encoder(key) + _key_separator
+            if isinstance(value, str):
+                yield buf + _encoder(value)
+            elif value is None:
+                yield buf + "null"
+            elif value is True:
+                yield buf + "true"
+            elif value is False:
+                yield buf + "false"
+            elif isinstance(value, int):
+                yield buf + _intstr(value)
+            elif isinstance(value, float):
+                yield buf + _floatstr(value)
+            else:
+                yield buf
+                if isinstance(value, list):
+                    yield from _iterencode_list(value, level)
+                elif isinstance(value, dict):
+                    yield from _iterencode_dict(value, level)
+                else:
+                    yield from _iterencode(value, level)
+        if first:
+            # All the keys were skipped
+            yield "{}"
+        else:
+            if newline_indent is not None:
+                yield "\n" + _indent * (level - 1)
+            yield "}"
+        if markers is not None:
+            del markers[markerid]
+
+    def _iterencode(o, level):
+        if isinstance(o, str):
+            yield _encoder(o)
+        elif o is None:
+            yield "null"
+        elif o is True:
+            yield "true"
+        elif o is False:
+            yield "false"
+        elif isinstance(o, int):
+            yield _intstr(o)
+        elif isinstance(o, float):
+            yield _floatstr(o)
+        elif isinstance(o, list):
+            yield from _iterencode_list(o, level)
+        else:
+            _asdict = _namedtuple_as_object and getattr(o, "_asdict", None)
+            if _asdict and callable(_asdict):
+                yield from _iterencode_dict(_asdict(), level)
+            elif isinstance(o, tuple):
+                if _tuple_as_array:
+                    yield from _iterencode_list(o, level)
+                else:
+                    yield from _iterencode_default(o, level)
+            elif isinstance(o, dict):
+                yield from _iterencode_dict(o, level)
+            elif _use_decimal and isinstance(o, Decimal):
+                yield str(o)
+            elif (iterators and isinstance(o, Iterator)) or (
+                _iterable_as_array and hasattr(o, "__iter__")
+            ):
+                yield from _iterencode_list(o, level)
+            else:
+                yield from _iterencode_default(o, level)
+
+    def _iterencode_default(o, level):
+        if markers is not None:
+            markerid = id(o)
+            if markerid in markers:
+                raise ValueError("Circular reference detected")
+            markers[markerid] = o
+        yield from _iterencode(_default(o), level)
+        if markers is not None:
+            del markers[markerid]
+
+    return _iterencode
+
+
+class NotNative(Exception):
+    """The object contains values the native encoder would pass to `default`."""
+
+
+def make_prepare(encoder, *, is_masked=None, placeholder=None, precision=None):
+    """Return `prepare(o)` applying the hooks of `make_iterencode` to `o` upfront.
+
+    Floats are rounded and masked values replaced, copying only the containers that
+    change, so the native encoder can encode the result with the same output. Other
+    objects are replaced by what `default` returns for them, prepared the same way.
+    For iterators and circular references `NotNative` is raised.
+    """
+    _default = encoder.default
+    _use_decimal = getattr(encoder, "use_decimal", False)
+    _namedtuple_as_object = getattr(encoder, "namedtuple_as_object", False)
+    _tuple_as_array = getattr(encoder, "tuple_as_array", True)
+    _iterable_as_array = getattr(encoder, "iterable_as_array", False)
+    scalars = (str, int, bool, type(None))
+    if precision is None:
+        scalars += (float,)
+
+    def _round(o):
+        # Only finite numbers give 0
+        return round(o, precision) if precision is not None and o - o == 0 else o
+
+    def _prepare(o):
+        cls = o.__class__
+        if cls in scalars:
+            return o
+        if cls is float:
+            return _round(o)
+        if cls is dict:
+            return _prepare_dict(o)
+        if cls is list:
+            return _prepare_list(o)
+        # The same checks as of `_iterencode` of `make_iterencode`
+        if isinstance(o, (str, int)):
+            return o
+        if isinstance(o, float):
+            return _round(o)
+        if isinstance(o, list):
+            return _prepare_list(o)
+        _asdict = _namedtuple_as_object and getattr(o, "_asdict", None)
+        if _asdict and callable(_asdict):
+            return _prepare_dict(_asdict())
+        if isinstance(o, tuple) and _tuple_as_array:
+            return _prepare_list(o)
+        if isinstance(o, dict):
+            return _prepare_dict(o)
+        if _use_decimal and isinstance(o, Decimal):
+            return o
+        if isinstance(o, Iterator) or (_iterable_as_array and hasattr(o, "__iter__")):
+            raise NotNative
+        return _prepare(_default(o))
+
+    def _prepare_list(lst):
+        copy = None
+        for index, value in enumerate(lst):
+            if value.__class__ in scalars:
+                continue
+            prepared = _prepare(value)
+            if prepared is not value:
+                if copy is None:
+                    copy = list(lst)
+                copy[index] = prepared
+        return lst if copy is None else copy
+
+    def _prepare_dict(dct):
+        copy = None
+        for key, value in dct.items():
+            if is_masked is not None:
+                if key.__class__ is not str:
+                    # Masked by their encoded form, left to the encoding loop
+                    raise NotNative
+                if is_masked(key):
+                    if _stats is not None:
+                        # Counted by the encoding loop, which doesn't start over
+                        raise NotNative
+                    if copy is None:
+                        copy = dict(dct)
+                    copy[key] = placeholder
+                    continue
+            if value.__class__ in scalars:
+                continue
+            prepared = _prepare(value)
+            if prepared is not value:
+                if copy is None:
+                    copy = dict(dct)
+                copy[key] = prepared
+        return dct if copy is None else copy
+
+    def prepare(o):
+        try:
+            return _prepare(o)
+        except RecursionError:
+            raise NotNative from None
+
+    return prepare
+
+
+class _DecimalNumber(str):
+    __slots__ = ()
+
+
+def make_decimal_iterencode(encoder):
+    """Return `_iterencode(o, level)` of the standard `json` encoder, encoding Decimals as numbers.
+
+    The native encoder calls `default` for Decimals, which turns them into strings
+    the string encoder passes as they are, without quotes.
+    """
+    if c_make_encoder is None or encoder.indent is not None:
+        return make_iterencode(encoder)
+    _encoder = encode_basestring_ascii if encoder.ensure_ascii else encode_basestring
+    _default = encoder.default
+
+    def encode_string(s):
+        if s.__class__ is _DecimalNumber:
+            return s
+        return _encoder(s)
+
+    def default(o):
+        if isinstance(o, Decimal):
+            return _DecimalNumber(o)
+        return _default(o)
+
+    return c_make_encoder(
+        {} if encoder.check_circular else None,
+        default,
+        encode_string,
+        encoder.indent,
+        encoder.key_separator,
+        encoder.item_separator,
+        encoder.sort_keys,
+        encoder.skipkeys,
+        encoder.allow_nan,
+    )
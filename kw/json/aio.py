@@ -0,0 +1,120 @@
+"""Encoding in asyncio applications, without blocking the loop by large payloads."""
+
+import asyncio
+from functools import partial
+
+from .encode import DEFAULT_CHUNK_SIZE, dumps, dumps_bytes
+from .parallel import with_registrations
+from .rows import encode_rows
+
+DEFAULT_OFFLOAD_THRESHOLD = 10000
+
+
+def is_large(obj, threshold=DEFAULT_OFFLOAD_THRESHOLD):
+    """Return whether `obj` has more than `threshold` items in lists, tuples and dicts.
+
+    Only up to `threshold` items are looked at, so it's cheap for any payload.
+    """
+    count = 0
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            values = value.values()
+        elif isinstance(value, (list, tuple)):
+            values = value
+        else:
+            continue
+        count += len(values)
+        if count > threshold:
+            return True
+        stack.extend(values)
+    return False
+
+
+def _is_records(value):
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) > 0
+        and type(value[0]).__name__ == "Record"  # asyncpg
+    )
+
+
+def _make_picklable(obj):
+    """Convert asyncpg Records, which can't be pickled, to dicts for process pools.
+
+    Lists of Records at the top level or in a top-level dict are converted, e.g.
+    results of `connection.fetch`.
+    """
+    if _is_records(obj):
+        return encode_rows(obj)
+    if isinstance(obj, dict) and any(_is_records(value) for value in obj.values()):
+        return {
+            key: encode_rows(value) if _is_records(value) else value
+            for key, value in obj.items()
+        }
+    return obj
+
+
+async def _run(func, obj, threshold, executor, kwargs):
+    if threshold is None or not is_large(obj, threshold):
+        return func(obj, **kwargs)
+    # Imported only when needed, it's slow to import
+    from concurrent.futures import (  # pylint: disable=import-outside-toplevel
+        ProcessPoolExecutor,
+    )
+
+    call = partial(func, obj, **kwargs)
+    if isinstance(executor, ProcessPoolExecutor):
+        call = with_registrations(partial(func, _make_picklable(obj), **kwargs))
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, call)
+
+
+async def adumps(obj, threshold=DEFAULT_OFFLOAD_THRESHOLD, executor=None, **kwargs):
+    """Return `obj` encoded as JSON, large payloads are encoded in `executor`.
+
+    Takes the same keyword arguments as `dumps`. Payloads with more than `threshold`
+    items (see `is_large`) are encoded in `executor`, the default one of the loop
+    if None, smaller ones right away. Pass `threshold=None` never to offload them.
+
+    Threads run only while the encoder calls back to Python, e.g. `default_encoder`,
+    so large payloads of plain types still hold the loop. A `ProcessPoolExecutor`
+    doesn't, but `obj` and `kwargs` have to be picklable then. asyncpg Records
+    aren't, lists of them are converted to dicts before being sent to the pool.
+    Registered encoders and fields and the backend are applied in the workers, see
+    `with_registrations`.
+    """
+    return await _run(dumps, obj, threshold, executor, kwargs)
+
+
+async def _write(fp, data):
+    result = fp.write(data)
+    if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+        await result
+    drain = getattr(fp, "drain", None)
+    if drain is not None:
+        await drain()
+    else:
+        # Let other tasks run between the chunks
+        await asyncio.sleep(0)
+
+
+async def adump(
+    obj,
+    fp,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    threshold=DEFAULT_OFFLOAD_THRESHOLD,
+    executor=None,
+    **kwargs,
+):
+    """Write `obj` as UTF-8 JSON to the asynchronous writer `fp`, see `adumps`.
+
+    `fp` takes bytes, e.g. `asyncio.StreamWriter`, aiohttp `StreamResponse` or
+    a file of aiofiles opened in binary mode. Its `write` can be a coroutine and
+    if it has `drain`, it's awaited after every chunk of `chunk_size` bytes.
+    """
+    data = await _run(dumps_bytes, obj, threshold, executor, kwargs)
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        await _write(fp, view[start : start + chunk_size])
@@ -0,0 +1,94 @@
+"""Formatting of dates and datetimes."""
+
+import datetime
+from functools import lru_cache
+
+from .exceptions import KiwiJsonError
+
+DEFAULT_DATE_CACHE_SIZE = 4096
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+TIMESPECS = ("auto", "hours", "minutes", "seconds", "milliseconds", "microseconds")
+
+
+def unix_time(obj):
+    """Return the wall clock time of `obj` in seconds since the epoch.
+
+    The same as `calendar.timegm(obj.timetuple())`, without building the time tuple.
+    """
+    if isinstance(obj, datetime.datetime):
+        return (
+            (obj.toordinal() - EPOCH_ORDINAL) * 86400
+            + obj.hour * 3600
+            + obj.minute * 60
+            + obj.second
+        )
+    if isinstance(obj, datetime.date):
+        return (obj.toordinal() - EPOCH_ORDINAL) * 86400
+    import calendar  # pylint: disable=import-outside-toplevel
+
+    return calendar.timegm(obj.timetuple())
+
+
+def _unix_time_milliseconds(obj):
+    seconds = unix_time(obj)
+    microsecond = getattr(obj, "microsecond", 0)
+    if microsecond:
+        return seconds + microsecond // 1000 / 1000
+    return seconds
+
+
+def _unix_time_microseconds(obj):
+    seconds = unix_time(obj)
+    microsecond = getattr(obj, "microsecond", 0)
+    if microsecond:
+        return seconds + microsecond / 1000000
+    return seconds
+
+
+def make_date_encoder(
+    date_as_unix_time=False,
+    timespec=None,
+    utc_suffix=None,
+    cache_size=DEFAULT_DATE_CACHE_SIZE,
+):
+    """Return a function encoding dates, datetimes and times.
+
+    Unix time is in whole seconds, unless `timespec` is "milliseconds" or
+    "microseconds", then it is a float with that precision. ISO formatted values
+    take `timespec` the same way as `datetime.isoformat` and "+00:00" offsets are
+    replaced with `utc_suffix` (e.g. "Z") if given. The last `cache_size` ISO
+    formatted values are cached, as formatting them is much slower than the lookup.
+    """
+    if timespec is not None and timespec not in TIMESPECS:
+        raise KiwiJsonError(f"Unknown timespec {timespec!r}")
+
+    if date_as_unix_time:
+        if timespec in (None, "auto", "seconds"):
+            return unix_time
+        if timespec == "milliseconds":
+            return _unix_time_milliseconds
+        if timespec == "microseconds":
+            return _unix_time_microseconds
+        raise KiwiJsonError(f"Unix time can't be encoded with timespec {timespec!r}")
+
+    def isoformat(obj, offset):
+        if timespec is None or not isinstance(obj, (datetime.datetime, datetime.time)):
+            text = obj.isoformat()
+        else:
+            text = obj.isoformat(timespec=timespec)
+        if utc_suffix is not None and text.endswith("+00:00"):
+            return text[:-6] + utc_suffix
+        return text
+
+    if not cache_size:
+        return lambda obj: isoformat(obj, None)
+
+    # Equal aware datetimes can differ in their offsets, that's a part of the key
+    cached = lru_cache(maxsize=cache_size, typed=True)(isoformat)
+
+    def encode(obj):
+        if getattr(obj, "tzinfo", None) is None:
+            return cached(obj, None)
+        return cached(obj, obj.utcoffset())
+
+    return encode
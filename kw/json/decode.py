@@ -0,0 +1,454 @@
+"""Decoding of values encoded by `default_encoder` back to dates, Decimals, UUIDs,
+enums, dataclasses and attrs classes."""
+
+import datetime
+import re
+import sys
+import weakref
+from decimal import Decimal
+from functools import lru_cache, partial
+
+from ._compat import (
+    _load,
+    _loads,
+    enum,
+    get_backend,
+    get_orjson,
+    make_json_decoder,
+    make_scanner,
+)
+from .encode import get_field_plan
+from .exceptions import KiwiJsonError
+from .projection import Projection
+from .stream import DEFAULT_READ_SIZE, iter_values
+from .utils import DEFAULT_CACHE_SIZE
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _fix_utc(value):
+    # `fromisoformat` doesn't take the "Z" suffix before Python 3.11
+    if value.endswith("Z"):
+        return value[:-1] + "+00:00"
+    return value
+
+
+def decode_datetime(value):
+    """Decode an ISO formatted datetime or unix time, as encoded with `date_as_unix_time`."""
+    if isinstance(value, str):
+        return datetime.datetime.fromisoformat(_fix_utc(value))
+    return EPOCH + datetime.timedelta(seconds=value)
+
+
+def decode_date(value):
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value)
+    return EPOCH.date() + datetime.timedelta(days=value // 86400)
+
+
+def decode_time(value):
+    return datetime.time.fromisoformat(_fix_utc(value))
+
+
+def decode_decimal(value):
+    if isinstance(value, float):
+        # The shortest representation, use `use_decimal=True` to keep all the digits
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+_registry = {
+    datetime.datetime: decode_datetime,
+    datetime.date: decode_date,
+    datetime.time: decode_time,
+    Decimal: decode_decimal,
+}
+_constructors = weakref.WeakKeyDictionary()
+
+
+def register_decoder(cls, func=None):
+    """Register `func` as the decoder of JSON values to instances of `cls`.
+
+    `func` receives the decoded JSON value, it's used for `cls` and its subclasses
+    found in schemas of `Decoder`. Can be used as a decorator.
+    """
+    if func is None:
+        return partial(register_decoder, cls)
+    _registry[cls] = func
+    _constructors.clear()
+    return func
+
+
+def _find_registered(cls):
+    for klass in cls.__mro__:
+        if klass in _registry:
+            return _registry[klass]
+    return None
+
+
+def _uuid_decoder(cls):
+    uuid = sys.modules.get("uuid")
+    if uuid is not None and issubclass(cls, uuid.UUID):
+        return cls
+    return None
+
+
+def _init_fields(cls, plan):
+    """Return (key, init argument, type) of fields of a dataclass or attrs class."""
+    keys = dict(zip(plan.names, plan.keys))
+    hints = _type_hints(cls)
+    if hasattr(cls, "__dataclass_fields__"):
+        fields = [
+            (field.name, field.name, field.type)
+            for field in cls.__dataclass_fields__.values()
+            if field.init and field.name in keys
+        ]
+    else:
+        fields = [
+            (a.name, getattr(a, "alias", None) or a.name.lstrip("_"), a.type)
+            for a in cls.__attrs_attrs__
+            if a.init and a.name in keys
+        ]
+    return [(keys[name], arg, hints.get(name, tp)) for name, arg, tp in fields]
+
+
+def _type_hints(cls):
+    import typing  # pylint: disable=import-outside-toplevel
+
+    try:
+        return typing.get_type_hints(cls)
+    except Exception:  # pylint: disable=broad-except
+        # Unresolvable forward references, the annotations are used as they are
+        return {}
+
+
+def get_constructor(cls):
+    """Return a function building an instance of a dataclass or attrs class from a dict.
+
+    Values are decoded according to the field types, keys renamed by
+    `register_fields` are taken into account and unknown keys are ignored.
+    It's built once per class and its field plan.
+    """
+    plan = get_field_plan(cls)
+    cached = _constructors.get(cls)
+    if cached is not None and cached[0] is plan:
+        return cached[1]
+
+    def constructor(data):
+        kwargs = {}
+        for key, value in data.items():
+            try:
+                arg, convert = fields[key]
+            except KeyError:
+                continue
+            if convert is not None and value is not None:
+                value = convert(value)
+            kwargs[arg] = value
+        return cls(**kwargs)
+
+    # Stored before the fields are resolved, so recursive classes find it
+    _constructors[cls] = (plan, constructor)
+    fields = {
+        key: (arg, _make_converter(tp)) for key, arg, tp in _init_fields(cls, plan)
+    }
+    return constructor
+
+
+def _is_union(tp):
+    import typing  # pylint: disable=import-outside-toplevel
+
+    # `X | Y` types of Python 3.10 don't have `__origin__`
+    return getattr(tp, "__origin__", None) is typing.Union or (
+        type(tp).__name__ == "UnionType"
+    )
+
+
+def _make_converter(tp):
+    """Return a function decoding JSON values to the type `tp`, None if they don't change.
+
+    The functions aren't called with None.
+    """
+    if tp is None or tp in (str, int, float, bool, object, dict, list):
+        return None
+    if isinstance(tp, type):
+        func = _find_registered(tp) or _uuid_decoder(tp)
+        if func is not None:
+            return func
+        if tp is tuple:
+            return tuple
+        if enum is not None and issubclass(tp, enum.Enum):
+            if issubclass(tp, (int, str)):
+                # The native encoders encode them by their values, e.g. IntEnum
+                return tp
+            # Enums are encoded by their names
+            return tp.__getitem__
+        if hasattr(tp, "__dataclass_fields__") or hasattr(tp, "__attrs_attrs__"):
+            return get_constructor(tp)
+        return None
+
+    args = getattr(tp, "__args__", None) or ()
+    if _is_union(tp):
+        types = [arg for arg in args if arg is not type(None)]
+        # Only optional values are decoded, other unions are ambiguous
+        return _make_converter(types[0]) if len(types) == 1 else None
+
+    origin = getattr(tp, "__origin__", None)
+    if origin is None:
+        if hasattr(tp, "__supertype__"):  # NewType
+            return _make_converter(tp.__supertype__)
+        if type(tp).__module__ == "typing":
+            # Any, type variables and other special forms aren't converters
+            return None
+        # Functions decoding the values themselves
+        return tp if callable(tp) else None
+    return _make_generic_converter(origin, args)
+
+
+def _make_generic_converter(origin, args):
+    from collections import abc  # pylint: disable=import-outside-toplevel
+
+    if not isinstance(origin, type):
+        return None
+    if issubclass(origin, tuple):
+        # Arrays are decoded as lists, tuples are always built
+        if not args or (len(args) == 2 and args[1] is Ellipsis):
+            convert = _make_converter(args[0]) if args else None
+            return tuple if convert is None else partial(_convert_items, convert, tuple)
+        return partial(_convert_tuple, [_make_converter(arg) for arg in args])
+    if issubclass(origin, abc.Mapping):
+        key_type, value_type = args if len(args) == 2 else (str, None)
+        convert_key = (
+            key_type if key_type in (int, float) else _make_converter(key_type)
+        )
+        convert_value = _make_converter(value_type)
+        if convert_key is None and convert_value is None:
+            return None
+        return partial(_convert_mapping, convert_key, convert_value)
+    if issubclass(origin, (abc.Set, abc.Iterable)):
+        convert = _make_converter(args[0]) if args else None
+        factory = origin if origin in (set, frozenset) else list
+        if issubclass(origin, abc.Set) and origin not in (set, frozenset):
+            factory = set
+        if convert is None:
+            return factory if factory is not list else None
+        return partial(_convert_items, convert, factory)
+    return None
+
+
+def _convert_items(convert, factory, values):
+    return factory([None if value is None else convert(value) for value in values])
+
+
+def _convert_tuple(converters, values):
+    return tuple(
+        value if convert is None or value is None else convert(value)
+        for convert, value in zip(converters, values)
+    )
+
+
+def _convert_mapping(convert_key, convert_value, values):
+    return {
+        key if convert_key is None else convert_key(key): (
+            value if convert_value is None or value is None else convert_value(value)
+        )
+        for key, value in values.items()
+    }
+
+
+def _make_object_hook(converters, patterns, object_hook, cache_size):
+    """Return an object hook decoding values under the given keys or key patterns."""
+    exact = {key: _make_key_converter(tp) for key, tp in (converters or {}).items()}
+    compiled = [
+        (re.compile(pattern), _make_key_converter(tp))
+        for pattern, tp in (patterns or {}).items()
+    ]
+
+    def find(key):
+        if key in exact:
+            return exact[key]
+        for pattern, convert in compiled:
+            if pattern.search(key) is not None:
+                return convert
+        return None
+
+    if cache_size and compiled:
+        find = lru_cache(maxsize=cache_size)(find)
+
+    def hook(obj):
+        for key, value in obj.items():
+            if value is not None:
+                convert = find(key)
+                if convert is not None:
+                    # Replacing values doesn't break iterating over the dict
+                    obj[key] = convert(value)
+        if object_hook is not None:
+            return object_hook(obj)
+        return obj
+
+    return hook
+
+
+def _make_key_converter(tp):
+    convert = _make_converter(tp)
+    if convert is None:
+        raise KiwiJsonError(f"Values can't be decoded as {tp!r}")
+    return convert
+
+
+class Decoder:
+    """Decoder configured once by `loads` keyword arguments, to be reused for many calls.
+
+    `schema` is the type of the decoded value, e.g. a dataclass or `List[Itinerary]`,
+    its fields are decoded according to their types. `converters` maps keys to
+    types of values under them in any object, `patterns` maps regular expressions
+    searched for in keys to such types. The types can be dates, datetimes, times,
+    Decimals, UUIDs, enums, dataclasses, attrs classes, their containers, types
+    registered with `register_decoder` or functions decoding the values. With
+    `select`, only the values under the given paths are decoded, see `Projection`.
+
+    Documents can be `str`, `bytes`, `bytearray`, `memoryview` or `mmap`. With
+    `backend="orjson"` and no other `loads` arguments, they are decoded by orjson
+    directly from the buffers, otherwise memoryviews and mmaps are decoded
+    from UTF-8 first.
+
+    >>> decoder = Decoder(converters={"departure": datetime.datetime})
+    >>> decoder.loads('{"departure": "2018-01-01T00:00:00"}')
+    {'departure': datetime.datetime(2018, 1, 1, 0, 0)}
+    """
+
+    def __init__(
+        self,
+        schema=None,
+        *,
+        converters=None,
+        patterns=None,
+        select=None,
+        backend=None,
+        cache_size=DEFAULT_CACHE_SIZE,
+        **kwargs,
+    ):
+        self.schema = schema
+        self._convert = _make_converter(schema)
+        if converters or patterns:
+            kwargs["object_hook"] = _make_object_hook(
+                converters, patterns, kwargs.get("object_hook"), cache_size
+            )
+        self._kwargs = kwargs
+        if select is not None:
+            self._projection = Projection(select, **kwargs)
+            self._loads = self._projection.loads
+        else:
+            self._projection = None
+            if backend is not None and not kwargs and get_backend(backend) == "orjson":
+                self._loads = _orjson_loads
+            else:
+                self._loads = partial(_loads_text, **kwargs)
+
+    def convert(self, obj):
+        """Return an already decoded JSON value converted according to the schema."""
+        if self._convert is None or obj is None:
+            return obj
+        return self._convert(obj)
+
+    def loads(self, s):
+        return self.convert(self._loads(s))
+
+    def load(self, fp):
+        return self.loads(fp.read())
+
+    def iterload(self, fp, prefix="", read_size=DEFAULT_READ_SIZE):
+        """Yield values under `prefix` decoded one at a time from the file-like `fp`.
+
+        `prefix` is a path like "items.item", where "item" stands for array elements.
+        The empty prefix yields whole documents, e.g. records of JSON Lines.
+        See `iter_values` for the details.
+        """
+        if self._projection is not None:
+            scan, prune = self._projection.scan, self._projection.prune
+        else:
+            scan, prune = make_scanner(make_json_decoder(**self._kwargs)), None
+        for value in iter_values(fp, prefix, scan, read_size):
+            if prune is not None:
+                value = prune(value)
+            yield self.convert(value)
+
+
+def _loads_text(s, **kwargs):
+    if not isinstance(s, (str, bytes)):
+        # Other buffers are decoded by neither of the backends
+        s = str(s, "utf-8")
+    return _loads(s, **kwargs)
+
+
+def _orjson_loads(s):
+    if not isinstance(s, (str, bytes, bytearray, memoryview)):
+        s = memoryview(s)
+    return get_orjson().loads(s)
+
+
+def loads(
+    s,
+    schema=None,
+    *,
+    converters=None,
+    patterns=None,
+    select=None,
+    backend=None,
+    **kwargs,
+):
+    """Decode the JSON document `s`, see `Decoder` for the decoding arguments."""
+    if (
+        schema is None
+        and not converters
+        and not patterns
+        and select is None
+        and backend is None
+    ):
+        return _loads_text(s, **kwargs)
+    decoder = Decoder(
+        schema,
+        converters=converters,
+        patterns=patterns,
+        select=select,
+        backend=backend,
+        **kwargs,
+    )
+    return decoder.loads(s)
+
+
+def load(
+    fp,
+    schema=None,
+    *,
+    converters=None,
+    patterns=None,
+    select=None,
+    backend=None,
+    **kwargs,
+):
+    """Decode the JSON document read from the file-like `fp`, see `loads`."""
+    if (
+        schema is None
+        and not converters
+        and not patterns
+        and select is None
+        and backend is None
+    ):
+        return _load(fp, **kwargs)
+    decoder = Decoder(
+        schema,
+        converters=converters,
+        patterns=patterns,
+        select=select,
+        backend=backend,
+        **kwargs,
+    )
+    return decoder.load(fp)
+
+
+def iterload(fp, prefix="", read_size=DEFAULT_READ_SIZE, **kwargs):
+    """Yield values under `prefix` from the file-like `fp`, see `Decoder.iterload`.
+
+    Takes the same keyword arguments as `loads`.
+    """
+    return Decoder(**kwargs).iterload(fp, prefix, read_size)
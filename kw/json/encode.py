@@ -1,98 +1,497 @@
-import calendar
-import uuid
+import sys
+import weakref
 from collections import namedtuple
 from collections.abc import ItemsView
 from decimal import Decimal
-from functools import partial
-
-from ._compat import BaseJSONEncoder, _dump, _dumps, enum, simplejson_available
-from .utils import mask_dict
+from functools import lru_cache, partial
+from operator import attrgetter
+
+from ._compat import (
+    BaseJSONEncoder,
+    enum,
+    get_backend,
+    get_orjson,
+    prevent_unexpected_argument_error,
+    simplejson_available,
+)
+from ._iterencode import (
+    NotNative,
+    make_decimal_iterencode,
+    make_iterencode,
+    make_prepare,
+)
+from .dates import make_date_encoder, unix_time
+from .exceptions import KiwiJsonError
+from .parallel import dumps_parallel
+from .rows import encode_rows
+from .utils import DEFAULT_CACHE_SIZE, DEFAULT_PLACEHOLDER, mask_dict
+
+# Set by `kw.json.stats` while collecting statistics, checked on the hot paths
+_stats = None
 
 
 def _fail(obj, *args, **kwargs):
     raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
 
 
-try:
-    from attr import asdict as attr_asdict
-except ImportError:
-    attr_asdict = _fail
+# attrs and dataclasses are imported only once their classes are encoded
+
+
+@lru_cache(maxsize=None)
+def _attr_asdict():
+    try:
+        from attr import asdict  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return asdict
+
+
+def _encode_date(obj, dict_factory, date_as_unix_time):
+    if date_as_unix_time:
+        return unix_time(obj)
+    return obj.isoformat()
+
+
+def _encode_arrow(obj, dict_factory, date_as_unix_time):
+    if date_as_unix_time:
+        if callable(obj.timestamp):
+            return obj.timestamp()
+        return obj.timestamp
+    return obj.isoformat()
+
+
+def _encode_str(obj, dict_factory, date_as_unix_time):
+    return str(obj)
+
+
+def _encode_set(obj, dict_factory, date_as_unix_time):
+    return list(obj)
+
+
+def _encode_enum(obj, dict_factory, date_as_unix_time):
+    return obj.name
+
+
+def _encode_pairs(obj, dict_factory, date_as_unix_time):
+    return dict_factory(obj)
+
+
+def _encode_asdict(obj, dict_factory, date_as_unix_time):
+    return dict_factory(obj.asdict().items())
+
+
+def _encode_row_proxy(obj, dict_factory, date_as_unix_time):
+    return dict_factory(obj.items())
+
+
+def _encode_result(obj, dict_factory, date_as_unix_time):
+    return encode_rows(obj, dict_factory=dict_factory)
+
+
+def _make_dataclass_encoder():
+    from dataclasses import asdict  # pylint: disable=import-outside-toplevel
+
+    def _encode_dataclass(obj, dict_factory, date_as_unix_time):
+        return asdict(obj, dict_factory=dict_factory)
+
+    return _encode_dataclass
+
+
+def _make_attrs_encoder():
+    asdict = _attr_asdict()
+    if asdict is None:
+        return _fail
+
+    def _encode_attrs(obj, dict_factory, date_as_unix_time):
+        return asdict(obj, dict_factory=dict_factory)
+
+    return _encode_attrs
+
+
+def _encode_html(obj, dict_factory, date_as_unix_time):
+    return str(obj.__html__())
+
+
+FieldPlan = namedtuple("FieldPlan", ["names", "keys", "getter", "masked"])
+FieldPlan.__doc__ = """Precomputed way of encoding instances of a dataclass or attrs class.
+
+`names` are the encoded attributes in order, `keys` the keys they are encoded under,
+`getter` returns a tuple of their values and values under `masked` keys are hidden.
+"""
+
+_field_options = weakref.WeakKeyDictionary()
+_plans = weakref.WeakKeyDictionary()
+
+
+def _field_names(cls):
+    """Return names of fields of a dataclass or attrs class, None for other classes."""
+    if hasattr(cls, "__dataclass_fields__"):
+        from dataclasses import fields  # pylint: disable=import-outside-toplevel
+
+        return [field.name for field in fields(cls)]
+    if hasattr(cls, "__attrs_attrs__") and _attr_asdict() is not None:
+        return [a.name for a in cls.__attrs_attrs__]
+    return None
 
-try:
-    from dataclasses import asdict as dc_asdict
-except ImportError:
-    dc_asdict = _fail
 
+def _make_getter(names):
+    if len(names) > 1:
+        return attrgetter(*names)
 
-def default_encoder(obj, dict_factory=dict, date_as_unix_time=False):
-    if hasattr(obj, "isoformat"):  # date, datetime, arrow
-        if date_as_unix_time:
-            if obj.__class__.__name__ == "Arrow":
-                if callable(obj.timestamp):
-                    return obj.timestamp()
-                return obj.timestamp
-            return calendar.timegm(obj.timetuple())
-        return obj.isoformat()
+    def getter(obj):
+        return tuple(getattr(obj, name) for name in names)
 
-    if isinstance(obj, (Decimal, uuid.UUID)):
-        return str(obj)
+    return getter
 
-    if isinstance(obj, set):
-        return list(obj)
 
-    if enum is not None and isinstance(obj, enum.Enum):
-        return obj.name
+def register_fields(cls, rename=None, omit=(), mask=()):
+    """Configure how fields of the dataclass or attrs class `cls` are encoded.
 
-    if isinstance(obj, ItemsView):
-        return dict_factory(obj)
+    Fields are encoded under the keys given by the `rename` mapping, fields in `omit`
+    are left out and values of fields in `mask` are masked. Instances of `cls` and its
+    subclasses are then always encoded one level at a time, as with `shallow=True`.
+    """
+    rename = dict(rename or {})
+    omit, mask = frozenset(omit), frozenset(mask)
+    names = _field_names(cls)
+    if names is None:
+        raise KiwiJsonError(f"{cls.__name__} is not a dataclass or an attrs class")
+    unknown = (set(rename) | omit | mask).difference(names)
+    if unknown:
+        raise KiwiJsonError(
+            f"{cls.__name__} has no fields {', '.join(sorted(unknown))}"
+        )
+    _field_options[cls] = (rename, omit, mask)
+    _plans.clear()
+    _clear_dispatch_caches()
+
+
+def _find_field_options(cls):
+    for klass in cls.__mro__:
+        if klass in _field_options:
+            return _field_options[klass]
+    return None
 
-    if hasattr(obj, "asdict"):
-        return dict_factory(obj.asdict().items())
 
-    if hasattr(obj, "__module__") and "sqlalchemy" in obj.__module__:
-        if obj.__class__.__name__ == "RowProxy":
-            return dict_factory(obj.items())
-        if obj.__class__.__name__ == "Row":
-            return dict_factory(obj)
+def get_field_plan(cls):
+    """Return the `FieldPlan` of a dataclass or attrs class, built once per class."""
+    try:
+        return _plans[cls]
+    except KeyError:
+        pass
+    names = _field_names(cls)
+    if names is None:
+        raise KiwiJsonError(f"{cls.__name__} is not a dataclass or an attrs class")
+    rename, omit, mask = _find_field_options(cls) or ({}, (), ())
+    names = tuple(name for name in names if name not in omit)
+    plan = _plans[cls] = FieldPlan(
+        names=names,
+        keys=tuple(rename.get(name, name) for name in names),
+        getter=_make_getter(names),
+        masked=frozenset(rename.get(name, name) for name in mask),
+    )
+    return plan
+
+
+def _make_plan_encoder(plan):
+    """Return an encoder mapping keys of `plan` to attribute values, leaving them unencoded.
+
+    Nested values are encoded only when the JSON encoder gets to them, so nothing
+    is deep copied. Attributes are read with `getattr`, so `__slots__` classes work.
+    Keys masked by `mask_dict` are found upfront instead of for every instance.
+    """
+    keys, getter, masked = plan.keys, plan.getter, plan.masked
+    masked_by_default = masked.union(key for key in keys if mask_dict.is_masked(key))
+
+    def _masked_pairs(values, hidden, placeholder):
+        return [
+            (key, placeholder if key in hidden else value)
+            for key, value in zip(keys, values)
+        ]
+
+    def _record(hidden):
+        stats = _stats
+        if stats is not None:
+            stats.masked_keys.update(hidden)
+
+    def encoder(obj, dict_factory, date_as_unix_time):
+        values = getter(obj)
+        if dict_factory is mask_dict:
+            if not masked_by_default:
+                return dict(zip(keys, values))
+            _record(masked_by_default)
+            return dict(_masked_pairs(values, masked_by_default, mask_dict.placeholder))
+        if masked:
+            _record(masked)
+            return dict_factory(_masked_pairs(values, masked, DEFAULT_PLACEHOLDER))
+        return dict_factory(zip(keys, values))
+
+    return encoder
+
+
+_registry = {}
+_DISPATCH_CACHE_SIZE = DEFAULT_CACHE_SIZE
+# Plain dicts, a weak-keyed lookup is about 3 times slower. They are cleared
+# when full, so classes created on the fly (e.g. by namedtuple) can be freed.
+_dispatch_cache = {}
+_shallow_dispatch_cache = {}
+
+
+def register_encoder(cls, func=None):
+    """Register `func` as the encoder for instances of `cls` and its subclasses.
+
+    `func` receives the object and returns a JSON serializable value. Registered
+    encoders take precedence over the built-in ones, the encoder of the nearest class
+    in the MRO is used, then the one of the most derived ABC. Can be used as a decorator.
+    """
+    if func is None:
+        return partial(register_encoder, cls)
+    _registry[cls] = func
+    _clear_dispatch_caches()
+    return func
+
+
+def _clear_dispatch_caches():
+    _dispatch_cache.clear()
+    _shallow_dispatch_cache.clear()
+
+
+def _registered_encoder(func):
+    def encoder(obj, dict_factory, date_as_unix_time):
+        return func(obj)
+
+    return encoder
+
+
+def _find_registered(cls):
+    for klass in cls.__mro__:
+        if klass in _registry:
+            return _registry[klass]
+    # Virtual subclasses, e.g. of ABCs, the most derived ABC wins
+    found = None
+    for klass in _registry:
+        if issubclass(cls, klass) and (found is None or issubclass(klass, found)):
+            found = klass
+    return None if found is None else _registry[found]
+
+
+def _resolve_encoder(cls, shallow=False):
+    """Find the encoder for the given class, keeping the order of the original checks.
+
+    With `shallow=True` dataclasses and attrs classes are encoded one level at a time.
+    """
+    func = _find_registered(cls)
+    if func is not None:
+        return _registered_encoder(func)
+
+    if _find_field_options(cls) is not None:
+        return _make_plan_encoder(get_field_plan(cls))
+
+    if hasattr(cls, "isoformat"):  # date, datetime, arrow
+        if cls.__name__ == "Arrow":
+            return _encode_arrow
+        return _encode_date
+
+    # UUIDs can't be encoded unless the module is imported already
+    uuid = sys.modules.get("uuid")
+    if issubclass(cls, Decimal) or (uuid is not None and issubclass(cls, uuid.UUID)):
+        return _encode_str
+
+    if issubclass(cls, set):
+        return _encode_set
+
+    if enum is not None and issubclass(cls, enum.Enum):
+        return _encode_enum
+
+    if issubclass(cls, ItemsView):
+        return _encode_pairs
+
+    if hasattr(cls, "asdict"):
+        return _encode_asdict
+
+    if "sqlalchemy" in (getattr(cls, "__module__", None) or ""):
+        if cls.__name__ == "RowProxy":
+            return _encode_row_proxy
+        if cls.__name__ in ("Row", "LegacyRow"):
+            return _encode_pairs
+        if cls.__name__.endswith(("Result", "ResultProxy")) and hasattr(cls, "keys"):
+            return _encode_result
+
+    if cls.__name__ == "Record":  # asyncpg
+        return _encode_pairs
+
+    if hasattr(cls, "__dataclass_fields__"):  # dataclasses
+        if shallow:
+            return _make_plan_encoder(get_field_plan(cls))
+        return _make_dataclass_encoder()
 
-    if obj.__class__.__name__ == "Record":  # asyncpg
-        return dict_factory(obj)
+    if hasattr(cls, "__attrs_attrs__"):  # attrs
+        if shallow and _attr_asdict() is not None:
+            return _make_plan_encoder(get_field_plan(cls))
+        return _make_attrs_encoder()
 
-    if hasattr(obj, "__dataclass_fields__"):  # dataclasses
-        return dc_asdict(obj, dict_factory=dict_factory)
+    if hasattr(cls, "__html__"):
+        return _encode_html
 
-    if hasattr(obj, "__attrs_attrs__"):  # attrs
-        return attr_asdict(obj, dict_factory=dict_factory)
+    return _fail
 
-    if hasattr(obj, "__html__"):
-        return str(obj.__html__())
 
-    _fail(obj)
+def default_encoder(
+    obj, dict_factory=dict, date_as_unix_time=False, shallow=False, date_encoder=None
+):
+    """Return a JSON serializable representation of `obj`.
+
+    With `shallow=True` dataclasses and attrs classes aren't converted with their
+    `asdict`, which deep copies them, only their fields are mapped to their values.
+    Dates, datetimes and times are encoded by `date_encoder` if given, see
+    `make_date_encoder`.
+    """
+    cls = obj.__class__
+    cache = _shallow_dispatch_cache if shallow else _dispatch_cache
+    try:
+        encoder = cache[cls]
+    except KeyError:
+        if len(cache) >= _DISPATCH_CACHE_SIZE:
+            cache.clear()
+        encoder = cache[cls] = _resolve_encoder(cls, shallow)
+    # Read once, other threads can disable the statistics meanwhile
+    stats = _stats
+    if encoder is _encode_date and date_encoder is not None:
+        if stats is not None:
+            return stats.time_call("default_encoder", cls, date_encoder, obj)
+        return date_encoder(obj)
+    if stats is not None:
+        return stats.time_call(
+            "default_encoder", cls, encoder, obj, dict_factory, date_as_unix_time
+        )
+    return encoder(obj, dict_factory, date_as_unix_time)
 
 
-def raw_encoder(obj, date_as_unix_time=False):
+def raw_encoder(obj, date_as_unix_time=False, shallow=False):
     """Return representation of values that are not encodable instead of encoding them."""
     try:
         return default_encoder(
-            obj, dict_factory=mask_dict, date_as_unix_time=date_as_unix_time
+            obj,
+            dict_factory=mask_dict,
+            date_as_unix_time=date_as_unix_time,
+            shallow=shallow,
         )
     except TypeError:
+        stats = _stats
+        if stats is not None:
+            stats.repr_fallbacks[obj.__class__] += 1
         return repr(obj)
 
 
-class MaskedJSONEncoder(BaseJSONEncoder):
+class KiwiJSONEncoder(BaseJSONEncoder):
+    """Encoder using `default_encoder` for objects that aren't natively encodable.
+
+    With `precision` given, floats are rounded to it while encoding. With
+    `iterators=True`, iterators (e.g. generators) are encoded as arrays. With
+    `shallow=True`, dataclasses and attrs classes are encoded without deep copies.
+    Dates are encoded according to `date_as_unix_time`, `timespec` and `utc_suffix`,
+    see `make_date_encoder`. With `use_decimal=True`, Decimals are encoded as numbers
+    even with the standard `json` module.
+    """
+
+    def __init__(
+        self,
+        *args,
+        precision=None,
+        iterators=False,
+        shallow=False,
+        date_as_unix_time=False,
+        timespec=None,
+        utc_suffix=None,
+        **kwargs,
+    ):
+        if not simplejson_available:
+            # simplejson takes it by itself
+            self.use_decimal = kwargs.pop("use_decimal", False)
+        super().__init__(*args, **kwargs)
+        self.precision = precision
+        self.iterators = iterators
+        self.shallow = shallow
+        self.date_as_unix_time = date_as_unix_time
+        self.date_encoder = _make_date_encoder(date_as_unix_time, timespec, utc_suffix)
+        # Built on the first call, the hooks are known only when subclasses are set up
+        self._hooks = None
+        self._prepare = None
+
+    def default(self, o):  # pylint: disable=method-hidden
+        return default_encoder(
+            o,
+            date_as_unix_time=self.date_as_unix_time,
+            shallow=self.shallow,
+            date_encoder=self.date_encoder,
+        )
+
+    def iterencode(self, o, *args, **kwargs):
+        hooks = self._hooks
+        if hooks is None:
+            hooks = self._hooks = self.iterencode_hooks()
+            if hooks and not self.iterators:
+                self._prepare = make_prepare(self, **hooks)
+        if hooks:
+            # Iterators are consumed and the output is yielded in small chunks by the
+            # encoding loop, other values are prepared for the faster native encoder
+            if self._prepare is None:
+                return make_iterencode(self, **hooks)(o, 0)
+            try:
+                o = self._prepare(o)
+            except NotNative:
+                return make_iterencode(self, **hooks)(o, 0)
+        if self.use_decimal and not simplejson_available:
+            return make_decimal_iterencode(self)(o, 0)
+        return super().iterencode(o, *args, **kwargs)
+
+    def iterencode_hooks(self):
+        """Return hooks for the encoding loop, the native one is used when they change nothing."""
+        hooks = {}
+        if self.precision is not None:
+            hooks["precision"] = self.precision
+        if self.iterators:
+            hooks["iterators"] = True
+        return hooks
+
+
+class MaskedJSONEncoder(KiwiJSONEncoder):
+    """Encoder masking values under dangerous looking keys.
+
+    By default only the top-level dict and dicts produced by `default_encoder` are
+    masked. With `recursive=True` dicts on every nesting level are masked while
+    encoding, without building masked copies of them.
+    """
+
+    def __init__(self, *args, recursive=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recursive = recursive
+
     def default(self, o):  # pylint: disable=method-hidden
-        return default_encoder(o, mask_dict)
+        return default_encoder(
+            o,
+            mask_dict,
+            date_as_unix_time=self.date_as_unix_time,
+            shallow=self.shallow,
+            date_encoder=self.date_encoder,
+        )
 
-    def encode(self, o):
-        if isinstance(o, dict):
+    def iterencode(self, o, *args, **kwargs):
+        if isinstance(o, dict) and not self.recursive:
             o = mask_dict(o)
-        return super().encode(o)
+        return super().iterencode(o, *args, **kwargs)
 
+    def iterencode_hooks(self):
+        hooks = super().iterencode_hooks()
+        if self.recursive:
+            hooks.update(
+                is_masked=mask_dict.is_masked, placeholder=mask_dict.placeholder
+            )
+        return hooks
 
-class KiwiJSONEncoder(BaseJSONEncoder):
-    def default(self, o):  # pylint: disable=method-hidden
-        return default_encoder(o)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DATE_OPTIONS = frozenset(("date_as_unix_time", "timespec", "utc_suffix"))
 
 
 def modify_kwargs(kwargs):
@@ -101,12 +500,42 @@ def modify_kwargs(kwargs):
     if simplejson_available:
         kwargs.setdefault("use_decimal", False)
     if "default" not in kwargs:
-        date_as_unix_time = kwargs.pop("date_as_unix_time", False)
-        kwargs["default"] = partial(
-            default_encoder, date_as_unix_time=date_as_unix_time
+        kwargs["default"] = _make_default(kwargs)
+    elif DATE_OPTIONS.intersection(kwargs):
+        # They configure `default_encoder`, they can't apply to another `default`
+        raise TypeError(
+            f"{', '.join(sorted(DATE_OPTIONS.intersection(kwargs)))} can't be used with default"
         )
 
 
+def _make_default(kwargs, dict_factory=dict):
+    """Return `default_encoder` configured by (and popped from) `dumps` keyword arguments."""
+    date_as_unix_time = kwargs.pop("date_as_unix_time", False)
+    return partial(
+        default_encoder,
+        dict_factory=dict_factory,
+        date_as_unix_time=date_as_unix_time,
+        shallow=kwargs.pop("shallow", False),
+        date_encoder=_make_date_encoder(
+            date_as_unix_time,
+            kwargs.pop("timespec", None),
+            kwargs.pop("utc_suffix", None),
+        ),
+    )
+
+
+def _make_date_encoder(date_as_unix_time, timespec, utc_suffix):
+    """Return the date encoder for the options, None if `default_encoder` handles them."""
+    if timespec is None and utc_suffix is None:
+        return None
+    return make_date_encoder(date_as_unix_time, timespec, utc_suffix)
+
+
+@lru_cache(maxsize=None)
+def _namedtuple_class(name, fields):
+    return namedtuple(name, fields)
+
+
 def format_value(value, precision):
     """Format provided value."""
     if isinstance(value, float):
@@ -124,13 +553,25 @@ def format_value(value, precision):
         if getattr(value, "_fields", False):
             # namedtuple should stay namedtuple - simplejson can format it differently
             # depending on the `namedtuple_as_object` param
-            NewNamedtuple = namedtuple(type(value).__name__, value._asdict().keys())
-            return NewNamedtuple(**format_value(value._asdict(), precision))
+            items = [format_value(item, precision) for item in value]
+            make = getattr(type(value), "_make", None)
+            if make is None:
+                make = _namedtuple_class(type(value).__name__, value._fields)._make
+            return make(items)
         # convert tuple to list; the tuple would be turned to list in simplejson/json anyways
         return traverse_iterable(list(value), precision)
     return value
 
 
+def _round_default(default, precision):
+    """Return `default` rounding floats in its output, as `KiwiJSONEncoder` does."""
+
+    def rounded(o):
+        return format_value(default(o), precision)
+
+    return rounded
+
+
 def traverse_iterable(iterable, precision):
     """Traverse list or set and round floats."""
     return [format_value(value, precision) for value in iterable]
@@ -141,23 +582,239 @@ def traverse_dict(obj, precision):
     return {key: format_value(value, precision) for key, value in obj.items()}
 
 
-def round_floats(args, kwargs):
-    data = args[0]
-    precision = kwargs.pop("precision", False)
-    new_args = list(args)
-    if precision is not False:
-        data = format_value(data, precision)
-        new_args[0] = data
-    return new_args
+def _make_orjson_dumps(kwargs):
+    """Return a function encoding with orjson, None if it can't honour the given `kwargs`."""
+    orjson = get_orjson()
+    kwargs = dict(kwargs)
+    option = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+    cls = kwargs.pop("cls", None)
+    dict_factory = dict
+    if cls is MaskedJSONEncoder:
+        dict_factory = mask_dict
+    elif cls not in (None, KiwiJSONEncoder):
+        return None
+
+    if kwargs.pop("sort_keys", False):
+        option |= orjson.OPT_SORT_KEYS
+
+    indent = kwargs.pop("indent", None)
+    if indent == 2:
+        option |= orjson.OPT_INDENT_2
+        separators = (",", ": ")
+    elif indent is None:
+        separators = (",", ":")
+    else:
+        return None
+    if tuple(kwargs.pop("separators", separators)) != separators:
+        return None
+
+    # orjson always outputs UTF-8 and doesn't know Decimal numbers
+    if kwargs.pop("ensure_ascii", False) or kwargs.pop("use_decimal", False):
+        return None
+
+    namedtuple_as_object = kwargs.pop("namedtuple_as_object", simplejson_available)
+    if "default" in kwargs:
+        default = kwargs.pop("default")
+        kwargs.pop("shallow", None)
+    else:
+        default = _make_default(kwargs, dict_factory)
+    precision = kwargs.pop("precision", None)
+    if precision is False:
+        precision = None
+    if kwargs:
+        return None
+    if precision is not None:
+        default = _round_default(default, precision)
+
+    def _default(o):
+        # orjson doesn't encode tuple subclasses
+        if isinstance(o, tuple):
+            if namedtuple_as_object and hasattr(o, "_asdict"):
+                return o._asdict()
+            return list(o)
+        return default(o)
+
+    def _dumps(obj):
+        if precision is not None:
+            obj = format_value(obj, precision)
+        if dict_factory is mask_dict and isinstance(obj, dict):
+            obj = mask_dict(obj)
+        return orjson.dumps(obj, default=_default, option=option)
+
+    return _dumps
+
+
+@prevent_unexpected_argument_error
+def make_encoder(kwargs, **options):
+    """Instantiate the encoder configured by `dumps` keyword arguments.
+
+    `options` are passed to `KiwiJSONEncoder` subclasses only. Returns the encoder
+    and the precision it can't round floats to by itself, if any.
+    """
+    precision = kwargs.pop("precision", None)
+    if precision is False:
+        precision = None
+    cls = kwargs.pop("cls", None)
+    if cls is None or not issubclass(cls, KiwiJSONEncoder):
+        # Other encoders get `default_encoder` configured by the date options
+        modify_kwargs(kwargs)
+        cls = cls or KiwiJSONEncoder
+    elif simplejson_available:
+        kwargs.setdefault("use_decimal", False)
+
+    if issubclass(cls, KiwiJSONEncoder):
+        return cls(precision=precision, **options, **kwargs), None
+    if precision is not None:
+        kwargs["default"] = _round_default(kwargs["default"], precision)
+    return cls(**kwargs), precision
+
+
+def _join_chunks(chunks, chunk_size):
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+class Encoder:
+    """Encoder configured once by `dumps` keyword arguments, to be reused for many calls.
+
+    >>> encoder = Encoder(date_as_unix_time=True, precision=2)
+    >>> encoder.dumps({"at": datetime.date(2018, 1, 1), "price": 1.2345})
+    '{"at": 1514764800, "price": 1.23}'
+    """
+
+    def __init__(self, **options):
+        self.options = options
+        kwargs = dict(options)
+        self.backend = get_backend(kwargs.pop("backend", None))
+        self._kwargs = kwargs
+        self._orjson_dumps = None
+        if self.backend == "orjson":
+            self._orjson_dumps = _make_orjson_dumps(kwargs)
+        if self._orjson_dumps is None:
+            self._encoder, self._precision = make_encoder(dict(kwargs))
+        self._stream_encoder = None
+
+    def dumps(self, obj, *, workers=None):
+        """Return `obj` encoded as JSON.
+
+        With `workers` given, large top-level lists and dicts are encoded in a pool
+        of that many processes, see `dumps_parallel`.
+        """
+        if workers:
+            return dumps_parallel(self, obj, workers)
+        if self._orjson_dumps is not None:
+            return self._orjson_dumps(obj).decode("utf-8")
+        if self._precision is not None:
+            obj = format_value(obj, self._precision)
+        return self._encoder.encode(obj)
+
+    def dumps_bytes(self, obj, buffer=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Return `obj` encoded as UTF-8 JSON.
+
+        The output of the orjson backend is returned as it is. If a `bytearray` is
+        given as `buffer`, it's cleared, the output is written to it in chunks of
+        roughly `chunk_size` characters and it's returned, so the buffer can be reused
+        for many calls. The `str` output still has to be encoded, the standard `json`
+        produces all of it upfront in large chunks, only simplejson streams it.
+        """
+        if self._orjson_dumps is not None:
+            data = self._orjson_dumps(obj)
+            if buffer is None:
+                return data
+            buffer[:] = data
+            return buffer
+        if buffer is None:
+            return self.dumps(obj).encode("utf-8")
+        if self._precision is not None:
+            obj = format_value(obj, self._precision)
+        del buffer[:]
+        if simplejson_available:
+            chunks = self._encoder.iterencode(obj)
+        else:
+            # The native encoder is used only in one shot, producing large chunks
+            chunks = self._encoder.iterencode(obj, _one_shot=True)
+        for chunk in _join_chunks(chunks, chunk_size):
+            buffer += chunk.encode("utf-8")
+        return buffer
+
+    def iterdumps(self, obj, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yield `obj` encoded as JSON in chunks of roughly `chunk_size` characters.
+
+        Iterators (e.g. generators) are encoded as arrays while being consumed,
+        so the whole document is never held in memory. The orjson backend can't
+        stream, the "json" one is used in its compact, not ASCII-escaped layout then.
+        """
+        if self._stream_encoder is None:
+            kwargs = dict(self._kwargs)
+            if self._orjson_dumps is not None:
+                kwargs.setdefault("ensure_ascii", False)
+                if kwargs.get("indent") is None:
+                    kwargs.setdefault("separators", (",", ":"))
+            self._stream_encoder, self._precision = make_encoder(kwargs, iterators=True)
+        encoder = self._stream_encoder
+        if isinstance(encoder, KiwiJSONEncoder):
+            chunks = encoder.iterencode(obj)
+        else:
+            _iterencode = make_iterencode(
+                encoder, precision=self._precision, iterators=True
+            )
+            chunks = _iterencode(obj, 0)
+        return _join_chunks(chunks, chunk_size)
+
+    def dump(self, obj, fp, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Write `obj` encoded as JSON to the file-like `fp` chunk by chunk, see `iterdumps`."""
+        for chunk in self.iterdumps(obj, chunk_size):
+            fp.write(chunk)
+
+
+@lru_cache(maxsize=128)
+def _cached_encoder(options):
+    return Encoder(**{key: value for key, _, value in options})
+
+
+def get_encoder(kwargs):
+    """Return an `Encoder` for `dumps` keyword arguments, cached if they are hashable."""
+    kwargs["backend"] = get_backend(kwargs.get("backend"))
+    # Types are part of the key, e.g. `precision=False` must not be mistaken for 0
+    options = tuple(sorted((key, type(value), value) for key, value in kwargs.items()))
+    try:
+        hash(options)
+    except TypeError:
+        return Encoder(**kwargs)
+    return _cached_encoder(options)
+
+
+def dumps(obj, *, workers=None, **kwargs):
+    return get_encoder(kwargs).dumps(obj, workers=workers)
+
+
+def dumps_bytes(obj, buffer=None, **kwargs):
+    """Return `obj` encoded as UTF-8 JSON, see `Encoder.dumps_bytes`."""
+    return get_encoder(kwargs).dumps_bytes(obj, buffer)
+
 
+def iterdumps(obj, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """Yield `obj` encoded as JSON in chunks of roughly `chunk_size` characters.
 
-def dumps(*args, **kwargs):
-    new_args = round_floats(args, kwargs)
-    modify_kwargs(kwargs)
-    return _dumps(*new_args, **kwargs)
+    Takes the same arguments as `dumps`, see `Encoder.iterdumps`.
+    """
+    return get_encoder(kwargs).iterdumps(obj, chunk_size)
 
 
-def dump(*args, **kwargs):
-    new_args = round_floats(args, kwargs)
-    modify_kwargs(kwargs)
-    return _dump(*new_args, **kwargs)
+def dump(obj, fp, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    """Write `obj` encoded as JSON to the file-like `fp` chunk by chunk, see `iterdumps`."""
+    get_encoder(kwargs).dump(obj, fp, chunk_size)
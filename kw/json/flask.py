@@ -1,15 +1,150 @@
 from __future__ import absolute_import
 
-from .encode import default_encoder
+from collections.abc import Iterator
+from functools import lru_cache, partial
+
+from .decode import loads
+from .encode import (
+    DATE_OPTIONS,
+    Encoder,
+    _make_default,
+    default_encoder,
+    dumps,
+)
+from .exceptions import KiwiJsonError
+
+_LAYOUTS = {
+    "default": {},
+    "compact": {"separators": (",", ":")},
+    "pretty": {"indent": 2},
+}
+
+
+@lru_cache(maxsize=None)
+def _provider_class():
+    """Return the JSON provider class, None for Flask older than 2.2 without providers."""
+    try:
+        from flask.json.provider import (  # pylint: disable=import-outside-toplevel
+            DefaultJSONProvider,
+        )
+    except ImportError:
+        return None
+
+    class KiwiJSONProvider(DefaultJSONProvider):
+        """JSON provider encoding with `kw.json`, responses are encoded to bytes directly.
+
+        `options` are `dumps` keyword arguments of the responses, e.g.
+        `date_as_unix_time`, `precision` or `cls=MaskedJSONEncoder`. They don't apply
+        to `dumps`, which Flask uses e.g. for the session cookies, only `encoder` and
+        `dict_factory` do. The date options can't be used with a custom `encoder`. An
+        `Encoder` is configured only once for each combination of `ensure_ascii`,
+        `sort_keys` and the layout of the responses. With
+        `stream_threshold` given, responses of lists with at least that many items and
+        of iterators (e.g. generators) are streamed in chunks.
+        """
+
+        def __init__(
+            self,
+            app,
+            encoder=default_encoder,
+            dict_factory=dict,
+            stream_threshold=None,
+            **options,
+        ):
+            super().__init__(app)
+            self.hooks = {}
+            if encoder is not default_encoder:
+                if DATE_OPTIONS.intersection(options):
+                    # They configure `default_encoder`, they can't apply to another one
+                    raise KiwiJsonError(
+                        f"{', '.join(sorted(DATE_OPTIONS.intersection(options)))} "
+                        "can't be used with a custom encoder"
+                    )
+
+                def default(o):
+                    return encoder(o, dict_factory)
+
+                self.hooks["default"] = default
+            elif dict_factory is not dict:
+                self.hooks["default"] = partial(
+                    default_encoder, dict_factory=dict_factory
+                )
+                # The date options of the responses configure the hook
+                options["default"] = _make_default(options, dict_factory)
+            self.options = options
+            self.stream_threshold = stream_threshold
+            self._encoders = {}
+
+        def _merge_options(self, *updates):
+            options = {"ensure_ascii": self.ensure_ascii, "sort_keys": self.sort_keys}
+            options.update(self.hooks)
+            for update in updates:
+                options.update(update)
+            return options
+
+        def get_encoder(self, layout="default"):
+            """Return the `Encoder` for the current settings, "compact" or "pretty" layout."""
+            key = (self.ensure_ascii, self.sort_keys, layout)
+            try:
+                return self._encoders[key]
+            except KeyError:
+                options = self._merge_options(self.options, _LAYOUTS[layout])
+                encoder = self._encoders[key] = Encoder(**options)
+                return encoder
+
+        def dumps(self, obj, **kwargs):
+            return dumps(obj, **self._merge_options(kwargs))
+
+        def loads(self, s, **kwargs):
+            return loads(s, **kwargs)
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            if (self.compact is None and self._app.debug) or self.compact is False:
+                encoder = self.get_encoder("pretty")
+            else:
+                encoder = self.get_encoder("compact")
+            if self._is_streamed(obj):
+                body = _stream(encoder, obj)
+            else:
+                # Chunks aren't joined, Content-Length is the sum of their lengths
+                body = [encoder.dumps_bytes(obj), b"\n"]
+            return self._app.response_class(body, mimetype=self.mimetype)
+
+        def _is_streamed(self, obj):
+            if self.stream_threshold is None:
+                return False
+            if isinstance(obj, (list, tuple)):
+                return len(obj) >= self.stream_threshold
+            return isinstance(obj, Iterator)
+
+    return KiwiJSONProvider
+
+
+def _stream(encoder, obj):
+    for chunk in encoder.iterdumps(obj):
+        yield chunk.encode("utf-8")
+    yield b"\n"
 
 
 class JSONExtension(object):
-    def __init__(self, app=None, encoder=default_encoder, dict_factory=dict):
+    def __init__(self, app=None, encoder=default_encoder, dict_factory=dict, **options):
         self.app = app
         if app is not None:
-            self.init_app(app, encoder, dict_factory)
+            self.init_app(app, encoder, dict_factory, **options)
+
+    def init_app(self, app, encoder=default_encoder, dict_factory=dict, **options):
+        """Install the JSON provider (or encoder before Flask 2.2) to `app`.
+
+        `options` are passed to `KiwiJSONProvider`, they need Flask 2.2 or newer.
+        """
+        provider_class = _provider_class()
+        if provider_class is not None:
+            app.json = provider_class(app, encoder, dict_factory, **options)
+            return
+        if options:
+            raise KiwiJsonError("Options of the extension need Flask 2.2 or newer")
 
-    def init_app(self, app, encoder=default_encoder, dict_factory=dict):
         from flask import json  # pylint: disable=import-outside-toplevel
 
         class JSONEncoder(json.JSONEncoder):
@@ -0,0 +1,143 @@
+"""Bulk encoding and decoding of JSON Lines (http://jsonlines.org)."""
+
+from collections import deque
+from itertools import islice
+
+from ._compat import make_json_decoder, prevent_unexpected_argument_error
+from .decode import Decoder
+from .encode import DEFAULT_CHUNK_SIZE, get_encoder
+from .exceptions import KiwiJsonError
+from .parallel import make_pool
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _make_line_encoder(kwargs):
+    """Return a function encoding one record, the encoder is configured only once."""
+    if kwargs.get("indent") is not None:
+        raise KiwiJsonError("JSON Lines can't be indented")
+    return get_encoder(dict(kwargs)).dumps
+
+
+def _encode_batch(records, kwargs):
+    encode = _make_line_encoder(kwargs)
+    return "".join([encode(record) + "\n" for record in records])
+
+
+def _batches(iterable, batch_size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _iter_parallel(pool, iterable, kwargs, workers, batch_size):
+    # Keep only a few batches in flight, so the iterable isn't consumed upfront
+    with pool as executor:
+        pending = deque()
+        for batch in _batches(iterable, batch_size):
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+            pending.append(executor.submit(_encode_batch, batch, kwargs))
+        while pending:
+            yield pending.popleft().result()
+
+
+def _iter_serial(iterable, encode, chunk_size):
+    buffer = []
+    size = 0
+    for record in iterable:
+        line = encode(record)
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            buffer.append("")
+            yield "\n".join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        buffer.append("")
+        yield "\n".join(buffer)
+
+
+def iterdumps_lines(
+    iterable,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    workers=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    **kwargs,
+):
+    """Yield records from `iterable` encoded as JSON Lines in chunks of roughly `chunk_size`.
+
+    Takes the same keyword arguments as `dumps`, except for `indent`.
+    With `workers` given, batches of `batch_size` records are encoded in a pool of
+    that many processes and yielded as chunks, so the records and `kwargs` have to
+    be picklable. The records are encoded here if the registrations can't be passed
+    to the workers, see `make_pool`.
+    """
+    encode = _make_line_encoder(kwargs)
+    if workers:
+        pool = make_pool(workers)
+        if pool is not None:
+            return _iter_parallel(pool, iterable, kwargs, workers, batch_size)
+    return _iter_serial(iterable, encode, chunk_size)
+
+
+def dumps_lines(iterable, **kwargs):
+    """Return records from `iterable` encoded as JSON Lines, see `iterdumps_lines`."""
+    return "".join(iterdumps_lines(iterable, **kwargs))
+
+
+def dump_lines(iterable, fp, **kwargs):
+    """Write records from `iterable` as JSON Lines to the file-like `fp`, see `iterdumps_lines`."""
+    for chunk in iterdumps_lines(iterable, **kwargs):
+        fp.write(chunk)
+
+
+@prevent_unexpected_argument_error
+def _make_decoder(kwargs):
+    return make_json_decoder(**kwargs)
+
+
+def load_lines(
+    fp,
+    schema=None,
+    *,
+    converters=None,
+    patterns=None,
+    select=None,
+    backend=None,
+    **kwargs,
+):
+    """Return an iterator of objects decoded from JSON Lines read from the file-like `fp`.
+
+    Takes the same arguments as `loads`, the decoder is configured only once for all
+    the lines. Empty lines are skipped.
+    """
+    if (
+        schema is None
+        and not converters
+        and not patterns
+        and select is None
+        and backend is None
+    ):
+        return _iter_decoded(fp, _make_decoder(kwargs).decode)
+    decoder = Decoder(
+        schema,
+        converters=converters,
+        patterns=patterns,
+        select=select,
+        backend=backend,
+        **kwargs,
+    )
+    return _iter_decoded(fp, decoder.loads)
+
+
+def _iter_decoded(fp, decode):
+    for line in fp:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if line.strip():
+            yield decode(line)
@@ -0,0 +1,197 @@
+"""Encoding of large top-level arrays and objects in a pool of processes."""
+
+import pickle
+from functools import partial
+from itertools import islice
+from operator import itemgetter
+
+from ._compat import get_backend, set_backend, simplejson_available
+
+# Chunks per worker, more of them balance the load of the workers better
+CHUNKS_PER_WORKER = 4
+
+
+def _registrations():
+    """Return the state configuring the encoding, besides the options of encoders."""
+    # Imported here, `encode` imports this module
+    from .encode import (  # pylint: disable=import-outside-toplevel
+        _field_options,
+        _registry,
+    )
+
+    return get_backend(), dict(_registry), dict(_field_options)
+
+
+def _init_worker(state):
+    from .encode import (  # pylint: disable=import-outside-toplevel
+        register_encoder,
+        register_fields,
+    )
+
+    backend, registry, field_options = state
+    set_backend(backend)
+    for cls, func in registry.items():
+        register_encoder(cls, func)
+    for cls, (rename, omit, mask) in field_options.items():
+        register_fields(cls, rename, omit, mask)
+
+
+def _is_picklable(state):
+    try:
+        pickle.dumps(state)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return False
+    return True
+
+
+# The state applied by `_call_registered` in this process
+_applied_state = None
+
+
+def _call_registered(state, call):
+    # Applied only when it changes, e.g. after new registrations
+    global _applied_state  # pylint: disable=global-statement
+    if state != _applied_state:
+        _init_worker(state)
+        _applied_state = state
+    return call()
+
+
+def with_registrations(call):
+    """Return `call` applying the registrations of this process first, for process pools.
+
+    Encoders registered by `register_encoder`, fields configured by `register_fields`
+    and the backend set by `set_backend` are applied in the worker running it. If
+    they can't be pickled, `call` is returned as it is.
+    """
+    state = _registrations()
+    if not _is_picklable(state):
+        return call
+    return partial(_call_registered, state, call)
+
+
+def make_pool(workers):
+    """Return a pool of `workers` processes encoding like this one, None if impossible.
+
+    Encoders registered by `register_encoder`, fields configured by `register_fields`
+    and the backend set by `set_backend` are passed to the workers. Unless they are
+    forked, the state has to be picklable, so e.g. lambdas can't be registered.
+    """
+    # Imported only when needed, they are slow to import
+    import multiprocessing  # pylint: disable=import-outside-toplevel
+    from concurrent.futures import (  # pylint: disable=import-outside-toplevel
+        ProcessPoolExecutor,
+    )
+
+    context = multiprocessing.get_context()
+    state = _registrations()
+    if context.get_start_method() != "fork" and not _is_picklable(state):
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(state,),
+    )
+
+
+def _encode_chunk(chunk, options):
+    from .encode import get_encoder  # pylint: disable=import-outside-toplevel
+
+    return get_encoder(dict(options)).dumps(chunk)
+
+
+def _key_string(key):
+    """Return the key as it's encoded, see `JSONEncoder.iterencode`."""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, float):
+        return float.__repr__(key)
+    return str(key)
+
+
+def _sort_key(backend):
+    if backend == "json" and not simplejson_available:
+        # The standard json compares the keys as they are
+        return itemgetter(0)
+    return lambda item: _key_string(item[0])
+
+
+def _split(obj, size, sort_key=None):
+    """Split a list, tuple or dict into lists or dicts of `size` items.
+
+    Items of dicts are sorted by `sort_key` if given, as the encoder would.
+    """
+    if isinstance(obj, dict):
+        items = sorted(obj.items(), key=sort_key) if sort_key else obj.items()
+        iterator = iter(items)
+        while True:
+            chunk = dict(islice(iterator, size))
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for start in range(0, len(obj), size):
+            yield list(obj[start : start + size])
+
+
+def _separators(probe):
+    """Return the text before the first item, between items and after the last one.
+
+    They are read from `probe`, the encoded `[0, 0]`, e.g. "\\n  ", ",\\n  " and "\\n"
+    with `indent=2`, so the stitched output is the same as that of the encoder.
+    """
+    inner = probe[1:-1]
+    first, last = inner.index("0"), inner.rindex("0")
+    return inner[:first], inner[first + 1 : last], inner[last + 1 :]
+
+
+def _stitch(fragments, separators):
+    """Join encoded chunks, dropping their brackets and the whitespace around items."""
+    before, between, after = separators
+    fragments = [fragment[1:-1] for fragment in fragments]
+    last = len(fragments) - 1
+    # Whitespace before the first item and after the last one is kept only once
+    for index, fragment in enumerate(fragments):
+        if index > 0:
+            fragment = fragment[len(before) :]
+        if index < last:
+            fragment = fragment[: len(fragment) - len(after)]
+        fragments[index] = fragment
+    return between.join(fragments)
+
+
+def dumps_parallel(encoder, obj, workers):
+    """Return `obj` encoded by `encoder` (an `Encoder`) in a pool of `workers` processes.
+
+    Top-level lists, tuples and dicts are split into chunks encoded in the pool and
+    stitched together, so the output is the same as that of `encoder.dumps`. Other
+    values and ones too small to be split are encoded right away. The chunks and
+    the options of the encoder are sent to the workers, they have to be picklable.
+    If the registrations can't be passed to the workers, see `make_pool`, `obj` is
+    encoded right away as well.
+    """
+    if not isinstance(obj, (list, tuple, dict)) or len(obj) < 2:
+        return encoder.dumps(obj)
+    size = -(-len(obj) // (workers * CHUNKS_PER_WORKER))
+    if size == len(obj):
+        return encoder.dumps(obj)
+    pool = make_pool(workers)
+    if pool is None:
+        return encoder.dumps(obj)
+    options = dict(encoder.options, backend=encoder.backend)
+    separators = _separators(encoder.dumps([0, 0]))
+    sort_key = _sort_key(encoder.backend) if options.get("sort_keys") else None
+    chunks = _split(obj, size, sort_key)
+
+    with pool as executor:
+        futures = [executor.submit(_encode_chunk, chunk, options) for chunk in chunks]
+        fragments = [future.result() for future in futures]
+    opening, closing = ("{", "}") if isinstance(obj, dict) else ("[", "]")
+    return opening + _stitch(fragments, separators) + closing
@@ -0,0 +1,241 @@
+"""Decoding of selected parts of JSON documents, without building the rest."""
+
+import re
+
+from ._compat import JSONDecodeError, make_json_decoder, make_scanner, scanstring
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+_CONTENT = r'[^"\[\]{}]*'
+# Arrays and objects without nested arrays or objects
+_LEAF = r"[\[{]" + _CONTENT + "(?:" + _STRING + _CONTENT + r")*[\]}]"
+# Everything up to the next bracket outside of strings and leaves, including it
+_NEXT_BRACKET = re.compile(
+    _CONTENT + "(?:(?:" + _STRING + "|" + _LEAF + ")" + _CONTENT + r")*[\[\]{}]", re.S
+)
+_SCALAR = re.compile(_STRING + r'|[^,:\[\]{}\s"]+', re.S)
+
+_SKIPPED = object()
+_MISSING = object()
+
+
+def parse_path(path):
+    """Split a path like "data.*.price" into keys, "*" matches any key or array index."""
+    return tuple(path.split("."))
+
+
+def _build_tree(select):
+    """Return a tree of nested dicts of the selected keys, None stands for whole values."""
+    tree = {}
+    for path in select:
+        node = tree
+        *parents, last = parse_path(path)
+        for key in parents:
+            child = node.setdefault(key, {})
+            if child is None:
+                # A parent is already selected as a whole
+                break
+            node = child
+        else:
+            node[last] = None
+    return tree
+
+
+def _skip_value(s, idx):
+    """Return the index after the value at `idx`, brackets are only counted."""
+    if s[idx] in "[{":
+        depth = 1
+        idx += 1
+        while depth:
+            match = _NEXT_BRACKET.match(s, idx)
+            if match is None:
+                raise JSONDecodeError("Unterminated value", s, idx)
+            idx = match.end()
+            depth += 1 if s[idx - 1] in "[{" else -1
+        return idx
+    match = _SCALAR.match(s, idx)
+    if match is None:
+        raise JSONDecodeError("Expecting value", s, idx)
+    return match.end()
+
+
+class Projection:
+    """Decoder of the values under the `select` paths of a JSON document.
+
+    The document is decoded to nested dicts and lists containing only the selected
+    values, e.g. with `select=["data.*.price", "meta.count"]`:
+
+    >>> Projection(["data.*.price", "meta.count"]).loads(
+    ...     '{"data": [{"price": 1, "name": "x"}], "meta": {"count": 1, "next": null}}'
+    ... )
+    {'data': [{'price': 1}], 'meta': {'count': 1}}
+
+    Objects on the way to the selected values are walked through key by key, other
+    objects which aren't selected are skipped by searching for brackets, without
+    building them, so they are only checked for being balanced. Elements of arrays
+    are decoded by the backend one at a time and pruned or dropped, which is faster
+    than walking through them, so the memory is bounded by the largest element. Elements selected by their index are kept in their order,
+    not at their positions. Object hooks are called only with the pruned objects.
+    """
+
+    def __init__(self, select, **kwargs):
+        self.tree = _build_tree(select)
+        self._object_hook = kwargs.pop("object_hook", None)
+        self._object_pairs_hook = kwargs.pop("object_pairs_hook", None)
+        self._hooks = self._object_hook or self._object_pairs_hook
+        # Decodes values without the object hooks, as they are called after pruning
+        self.scan = make_scanner(make_json_decoder(**kwargs))
+
+    def loads(self, s):
+        if not isinstance(s, str):
+            s = str(s, "utf-8")
+        idx = _WHITESPACE.match(s, 0).end()
+        value, idx = self._project(s, idx, self.tree)
+        idx = _WHITESPACE.match(s, idx).end()
+        if idx != len(s):
+            raise JSONDecodeError("Extra data", s, idx)
+        return None if value is _MISSING else value
+
+    def prune(self, value):
+        """Return the selected parts of an already decoded value."""
+        value = self._prune(value, self.tree)
+        return None if value is _MISSING else value
+
+    def _project(self, s, idx, tree):
+        try:
+            char = s[idx]
+        except IndexError:
+            raise JSONDecodeError("Expecting value", s, idx) from None
+        if char == "{":
+            return self._project_object(s, idx + 1, tree)
+        if char == "[":
+            return self._project_array(s, idx + 1, tree)
+        # Scalars have no keys to select
+        return _MISSING, _skip_value(s, idx)
+
+    def _project_object(self, s, idx, tree):
+        pairs = []
+        whitespace = _WHITESPACE.match
+        idx = whitespace(s, idx).end()
+        if s[idx : idx + 1] == "}":
+            return self._make_object(pairs), idx + 1
+        default = tree.get("*", _SKIPPED)
+        while True:
+            if s[idx : idx + 1] != '"':
+                raise JSONDecodeError("Expecting property name", s, idx)
+            key, idx = scanstring(s, idx + 1)
+            idx = whitespace(s, idx).end()
+            if s[idx : idx + 1] != ":":
+                raise JSONDecodeError("Expecting ':' delimiter", s, idx)
+            idx = whitespace(s, idx + 1).end()
+            value, idx = self._select(s, idx, tree.get(key, default))
+            if value is not _MISSING:
+                pairs.append((key, value))
+            idx = whitespace(s, idx).end()
+            char = s[idx : idx + 1]
+            if char == "}":
+                return self._make_object(pairs), idx + 1
+            if char != ",":
+                raise JSONDecodeError("Expecting ',' delimiter", s, idx)
+            idx = whitespace(s, idx + 1).end()
+
+    def _decode_selected(self, s, idx):
+        value, idx = self.scan(s, idx)
+        return self._call_hooks(value), idx
+
+    def _call_hooks(self, value):
+        if not self._hooks:
+            return value
+        if isinstance(value, dict):
+            return self._make_object(
+                [(key, self._call_hooks(item)) for key, item in value.items()]
+            )
+        if isinstance(value, list):
+            return [self._call_hooks(item) for item in value]
+        return value
+
+    def _prune(self, value, tree):
+        if isinstance(value, dict):
+            pairs = []
+            default = tree.get("*", _SKIPPED)
+            for key, item in value.items():
+                subtree = tree.get(key, default)
+                if subtree is None:
+                    pairs.append((key, self._call_hooks(item)))
+                elif subtree is not _SKIPPED:
+                    item = self._prune(item, subtree)
+                    if item is not _MISSING:
+                        pairs.append((key, item))
+            return self._make_object(pairs)
+        if isinstance(value, list):
+            default = tree.get("*", _SKIPPED)
+            values = []
+            for index, item in enumerate(value):
+                subtree = tree.get(str(index), default)
+                if subtree is None:
+                    values.append(self._call_hooks(item))
+                elif subtree is not _SKIPPED:
+                    item = self._prune(item, subtree)
+                    if item is not _MISSING:
+                        values.append(item)
+            return values
+        return _MISSING
+
+    def _project_array(self, s, idx, tree):
+        values = []
+        whitespace = _WHITESPACE.match
+        idx = whitespace(s, idx).end()
+        if s[idx : idx + 1] == "]":
+            return values, idx + 1
+        default = tree.get("*", _SKIPPED)
+        by_index = len(tree) > 1 or default is _SKIPPED
+        index = 0
+        while True:
+            subtree = tree.get(str(index), default) if by_index else default
+            if subtree is None or subtree is _SKIPPED:
+                value, idx = self._select(s, idx, subtree)
+            else:
+                value, idx = self.scan(s, idx)
+                value = self._prune(value, subtree)
+            if value is not _MISSING:
+                values.append(value)
+            idx = whitespace(s, idx).end()
+            char = s[idx : idx + 1]
+            if char == "]":
+                return values, idx + 1
+            if char != ",":
+                raise JSONDecodeError("Expecting ',' delimiter", s, idx)
+            idx = whitespace(s, idx + 1).end()
+            index += 1
+
+    def _select(self, s, idx, subtree):
+        if subtree is None:
+            return self._decode_selected(s, idx)
+        if subtree is _SKIPPED:
+            if s[idx : idx + 1] == "[":
+                return _MISSING, self._skip_array(s, idx + 1)
+            return _MISSING, _skip_value(s, idx)
+        return self._project(s, idx, subtree)
+
+    def _skip_array(self, s, idx):
+        # Decoding and dropping the elements one at a time is faster than
+        # searching for brackets, as the backend does it in C
+        whitespace = _WHITESPACE.match
+        idx = whitespace(s, idx).end()
+        if s[idx : idx + 1] == "]":
+            return idx + 1
+        while True:
+            idx = whitespace(s, self.scan(s, idx)[1]).end()
+            char = s[idx : idx + 1]
+            if char == "]":
+                return idx + 1
+            if char != ",":
+                raise JSONDecodeError("Expecting ',' delimiter", s, idx)
+            idx = whitespace(s, idx + 1).end()
+
+    def _make_object(self, pairs):
+        if self._object_pairs_hook is not None:
+            return self._object_pairs_hook(pairs)
+        if self._object_hook is not None:
+            return self._object_hook(dict(pairs))
+        return dict(pairs)
@@ -0,0 +1,86 @@
+"""Encoding of database result sets, reading their column names only once."""
+
+from collections.abc import Mapping
+from itertools import chain
+from operator import itemgetter
+
+_EMPTY = object()
+
+# Set by `kw.json.stats` while collecting statistics
+_stats = None
+
+
+def _row_keys(row):
+    fields = getattr(row, "_fields", None)  # SQLAlchemy rows, namedtuples
+    if fields is not None:
+        return list(fields)
+    return list(row.keys())  # asyncpg Records, SQLAlchemy RowProxy, mappings
+
+
+def _make_values_getter(row, keys):
+    if isinstance(row, Mapping):
+        if len(keys) == 1:
+            key = keys[0]
+            return lambda row: (row[key],)
+        return itemgetter(*keys)
+    # Rows iterate over their values in the order of their keys
+    return tuple
+
+
+def _record(keys, hidden, count):
+    stats = _stats
+    if stats is not None:
+        for index in hidden:
+            stats.masked_keys[keys[index]] += count
+
+
+def encode_rows(rows, columnar=False, dict_factory=dict):
+    """Return `rows` of a result set as a JSON serializable value.
+
+    Rows can be SQLAlchemy rows, asyncpg Records, namedtuples or mappings, all with
+    the same keys. Their keys are read only once, from the result set if it has them
+    or from its first row. Keys masked by `dict_factory` (e.g. `mask_dict`) are found
+    once as well. With `columnar=True` a `{"columns": [...], "rows": [[...], ...]}`
+    dict is returned instead of a list of dicts.
+    """
+    iterator = iter(rows)
+    first = next(iterator, _EMPTY)
+    if callable(getattr(rows, "keys", None)):  # SQLAlchemy results
+        keys = list(rows.keys())
+    elif first is not _EMPTY:
+        keys = _row_keys(first)
+    else:
+        keys = []
+    if first is _EMPTY:
+        return {"columns": keys, "rows": []} if columnar else []
+
+    values = _make_values_getter(first, keys)
+    rows = chain((first,), iterator)
+    is_masked = getattr(dict_factory, "is_masked", None)
+    hidden = [i for i, key in enumerate(keys) if is_masked(key)] if is_masked else []
+
+    if columnar:
+        if not hidden:
+            return {"columns": keys, "rows": [list(values(row)) for row in rows]}
+        encoded = []
+        for row in rows:
+            row = list(values(row))
+            for index in hidden:
+                row[index] = dict_factory.placeholder
+            encoded.append(row)
+        _record(keys, hidden, len(encoded))
+        return {"columns": keys, "rows": encoded}
+
+    if is_masked is None and dict_factory is not dict:
+        return [dict_factory(zip(keys, values(row))) for row in rows]
+    if not hidden:
+        return [dict(zip(keys, values(row))) for row in rows]
+    hidden_keys = [keys[index] for index in hidden]
+    encoded = []
+    for row in rows:
+        row = dict(zip(keys, values(row)))
+        for key in hidden_keys:
+            row[key] = dict_factory.placeholder
+        encoded.append(row)
+    _record(keys, hidden, len(encoded))
+    return encoded
@@ -0,0 +1,55 @@
+"""Starlette and FastAPI responses encoded by `kw.json`."""
+
+from starlette.responses import Response, StreamingResponse
+
+from .encode import DEFAULT_CHUNK_SIZE, get_encoder
+
+# The same output as of Starlette's `JSONResponse`
+DEFAULT_OPTIONS = {"ensure_ascii": False, "separators": (",", ":"), "allow_nan": False}
+
+
+class KiwiJSONResponse(Response):
+    """JSON response encoded straight to UTF-8 bytes by `kw.json`.
+
+    Values which aren't natively encodable are encoded by `default_encoder` in the
+    same pass, so endpoints returning the response don't need FastAPI's
+    `jsonable_encoder`. `options` are `dumps` keyword arguments, override them in
+    subclasses, e.g. with `{**DEFAULT_OPTIONS, "date_as_unix_time": True}`.
+    """
+
+    media_type = "application/json"
+    options = DEFAULT_OPTIONS
+
+    def render(self, content):
+        return get_encoder(dict(self.options)).dumps_bytes(content)
+
+
+class KiwiJSONStreamingResponse(StreamingResponse):
+    """JSON response streamed in chunks of roughly `chunk_size` characters, see `iterdumps`.
+
+    Iterators (e.g. generators) in `content` are encoded as arrays while being
+    consumed, in Starlette's thread pool, so large results are never held in memory
+    as a whole. `options` are the same as of `KiwiJSONResponse`.
+    """
+
+    media_type = "application/json"
+    options = DEFAULT_OPTIONS
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        content,
+        status_code=200,
+        headers=None,
+        media_type=None,
+        background=None,
+        *,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+    ):
+        chunks = get_encoder(dict(self.options)).iterdumps(content, chunk_size)
+        super().__init__(
+            (chunk.encode("utf-8") for chunk in chunks),
+            status_code,
+            headers,
+            media_type,
+            background,
+        )
@@ -0,0 +1,181 @@
+"""Incremental decoding of values from large JSON documents and JSON Lines."""
+
+import codecs
+import re
+
+from ._compat import JSONDecodeError, scanstring
+
+DEFAULT_READ_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# What may follow a number in it, e.g. its fraction or exponent
+_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
+# Errors this close to the end of the text may be caused by a value cut by it,
+# e.g. "-Infinit" or a surrogate pair of "\uXXXX" escapes
+_TRUNCATED_LENGTH = 12
+
+
+def parse_prefix(prefix):
+    """Split a prefix like "items.item" into keys, "item" stands for array elements."""
+    return tuple(prefix.split(".")) if prefix else ()
+
+
+class _Buffer:
+    """Text read from a file-like object, only the part which isn't decoded yet is kept."""
+
+    def __init__(self, fp, read_size):
+        self._read = fp.read
+        self._read_size = read_size
+        self._utf8 = None
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        # Where the text starts in the document, for the positions of errors
+        self._offset = 0
+        self._lines = 0
+        self._line_start = 0
+
+    def fill(self):
+        """Read more text, returns False at the end of the file."""
+        if self.eof:
+            return False
+        self._lines += self.text.count("\n", 0, self.pos)
+        newline = self.text.rfind("\n", 0, self.pos)
+        if newline >= 0:
+            self._line_start = self._offset + newline + 1
+        self._offset += self.pos
+        remaining = self.text[self.pos :]
+        # Reading at least as much as is buffered keeps retried decoding linear
+        chunk = self._read(max(self._read_size, len(remaining)))
+        if not chunk:
+            self.eof = True
+        if not isinstance(chunk, str):
+            if self._utf8 is None:
+                self._utf8 = codecs.getincrementaldecoder("utf-8")()
+            chunk = self._utf8.decode(chunk, final=self.eof)
+        self.text = remaining + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next character after whitespace, empty at the end of the file."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def error(self, msg, pos):
+        """Return `JSONDecodeError` at `pos` of the text, positioned in the whole document."""
+        newline = self.text.rfind("\n", 0, pos)
+        lineno = self._lines + self.text.count("\n", 0, pos) + 1
+        if newline >= 0:
+            colno = pos - newline
+        else:
+            colno = self._offset + pos - self._line_start + 1
+        error = JSONDecodeError(msg, self.text, pos)
+        error.pos = pos = self._offset + pos
+        error.lineno, error.colno = lineno, colno
+        error.args = (f"{msg}: line {lineno} column {colno} (char {pos})",)
+        return error
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self.error(f"Expecting {char!r}", self.pos)
+        self.pos += 1
+
+    def decode(self, scan):
+        """Return the value at the current position decoded by `scan`."""
+        self.peek()
+        while True:
+            try:
+                value, end = scan(self.text, self.pos)
+            except JSONDecodeError as error:
+                # The value may continue in the text which isn't read yet
+                truncated = error.pos >= len(self.text) - _TRUNCATED_LENGTH or (
+                    error.msg.startswith("Unterminated string")
+                )
+                if not truncated or not self.fill():
+                    raise self.error(error.msg, error.pos) from None
+                continue
+            # So does a number cut by the end of the buffer, e.g. "1." of "1.5"
+            tail = _NUMBER_TAIL.match(self.text, end).end()
+            if tail < len(self.text) or self.eof:
+                self.pos = end
+                return value
+            self.fill()
+
+    def decode_key(self):
+        self.expect('"')
+        self.pos -= 1
+        key = self.decode(lambda text, pos: scanstring(text, pos + 1))
+        self.expect(":")
+        return key
+
+
+def _iter_items(buffer, closing):
+    """Yield once for each array element or object member, then consume `closing`."""
+    if buffer.peek() == closing:
+        buffer.pos += 1
+        return
+    while True:
+        yield
+        char = buffer.peek()
+        buffer.pos += 1
+        if char == closing:
+            return
+        if char != ",":
+            raise buffer.error("Expecting ',' delimiter", buffer.pos - 1)
+
+
+def _skip(buffer, scan):
+    """Skip the value at the current position, decoding one item of it at a time."""
+    char = buffer.peek()
+    if char == "[":
+        buffer.pos += 1
+        for _ in _iter_items(buffer, "]"):
+            buffer.decode(scan)
+    elif char == "{":
+        buffer.pos += 1
+        for _ in _iter_items(buffer, "}"):
+            buffer.decode_key()
+            buffer.decode(scan)
+    else:
+        buffer.decode(scan)
+
+
+def _iter_prefix(buffer, prefix, scan):
+    if not prefix:
+        yield buffer.decode(scan)
+        return
+    key, rest = prefix[0], prefix[1:]
+    char = buffer.peek()
+    if char == "[" and key == "item":
+        buffer.pos += 1
+        for _ in _iter_items(buffer, "]"):
+            yield from _iter_prefix(buffer, rest, scan)
+    elif char == "{":
+        buffer.pos += 1
+        for _ in _iter_items(buffer, "}"):
+            if buffer.decode_key() == key:
+                yield from _iter_prefix(buffer, rest, scan)
+            else:
+                _skip(buffer, scan)
+    else:
+        _skip(buffer, scan)
+
+
+def iter_values(fp, prefix, scan, read_size=DEFAULT_READ_SIZE):
+    """Yield values under `prefix` in the JSON documents read from `fp`, decoded by `scan`.
+
+    `fp` can be a text or binary file-like object, e.g. a file, a memory-mapped file
+    or `socket.makefile`. Any number of whitespace separated documents is read, so
+    JSON Lines work as well. Values which aren't under the prefix are skipped one
+    item at a time, so only the largest item and `read_size` characters are held
+    in memory.
+    """
+    buffer = _Buffer(fp, read_size)
+    prefix = parse_prefix(prefix)
+    while buffer.peek():
+        yield from _iter_prefix(buffer, prefix, scan)
@@ -1,13 +1,56 @@
+import re
+from functools import lru_cache
+from time import perf_counter
+
 DEFAULT_PLACEHOLDER = "-- MASKED --"
 DEFAULT_BLACKLIST = frozenset(("secret", "token", "password", "key", "zoozappkey"))
 DEFAULT_WHITELIST = frozenset(("booking_token", "public_key", "idempotency_key"))
+DEFAULT_CACHE_SIZE = 4096
+
+# Set by `kw.json.stats` while collecting statistics, checked on the hot paths
+_stats = None
+
+
+def _compile_matcher(blacklist, whitelist, cache_size):
+    """Return a function telling whether the value under the given key should be masked.
+
+    The blacklist is compiled into a single regular expression and the verdicts
+    are memoized per key, as the same keys tend to repeat a lot.
+    """
+    if not blacklist:
+        return lambda key: False
+
+    search = re.compile("|".join(re.escape(word) for word in blacklist)).search
+
+    @lru_cache(maxsize=cache_size)
+    def is_masked(key):
+        key = key.lower()
+        return key not in whitelist and search(key) is not None
+
+    return is_masked
+
+
+def _mask_items(items, is_masked, placeholder, stats, cls):
+    """Return the masked dict like `mask_dict`, recording it to `stats`."""
+    start = perf_counter()
+    masked = {}
+    for key, value in items:
+        if is_masked(key):
+            stats.masked_keys[key] += 1
+            value = placeholder
+        masked[key] = value
+    stats.record("mask_dict", cls, perf_counter() - start)
+    return masked
 
 
 def mask_dict_factory(
     placeholder=DEFAULT_PLACEHOLDER,
     blacklist=DEFAULT_BLACKLIST,
     whitelist=DEFAULT_WHITELIST,
+    cache_size=DEFAULT_CACHE_SIZE,
 ):
+    is_masked = _compile_matcher(blacklist, whitelist, cache_size)
+
     def mask_dict(pairs):
         """Return a dict with dangerous looking key/value pairs masked."""
         if pairs is None:
@@ -18,16 +61,15 @@ def mask_dict_factory(
         else:
             items = pairs
 
-        return {
-            key: (
-                placeholder
-                if key.lower() not in whitelist
-                and any(word in key.lower() for word in blacklist)
-                else value
-            )
-            for key, value in items
-        }
+        # Read once, other threads can disable the statistics meanwhile
+        stats = _stats
+        if stats is not None:
+            return _mask_items(items, is_masked, placeholder, stats, pairs.__class__)
+        return {key: placeholder if is_masked(key) else value for key, value in items}
 
+    # Used for masking while encoding, without building the masked dicts
+    mask_dict.is_masked = is_masked
+    mask_dict.placeholder = placeholder
     return mask_dict
 
 
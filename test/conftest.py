@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from kw.json import encode
+
+
+@pytest.fixture
+def event_loop_restored():
+    """Set a new event loop after the test, `asyncio.run` leaves the thread without one."""
+    yield
+    asyncio.set_event_loop(asyncio.new_event_loop())
+
+
+@pytest.fixture
+def registry():
+    """Remove the encoders registered by the test."""
+    yield
+    encode._registry.clear()
+    encode._clear_dispatch_caches()
+
+
+@pytest.fixture
+def field_options():
+    """Remove the fields configured by the test."""
+    yield
+    encode._field_options.clear()
+    encode._plans.clear()
+    encode._clear_dispatch_caches()
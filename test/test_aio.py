@@ -0,0 +1,177 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+from operator import attrgetter
+
+import pytest
+
+from kw.json import adump, adumps, dumps, dumps_bytes, register_encoder
+from kw.json.aio import is_large
+
+pytestmark = pytest.mark.usefixtures("event_loop_restored")
+
+
+class Record:
+    """Stand-in for `asyncpg.Record`, which can't be pickled."""
+
+    def __init__(self, **values):
+        self._values = values
+
+    def keys(self):
+        return iter(self._values)
+
+    def __iter__(self):
+        return iter(self._values.values())
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __reduce__(self):
+        raise TypeError("Record can't be pickled")
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+class Writer:
+    """Asynchronous writer like aiofiles files, `write` is a coroutine."""
+
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, data):
+        self.chunks.append(bytes(data))
+
+
+class StreamWriter:
+    """Writer like `asyncio.StreamWriter`, `write` is synchronous and `drain` isn't."""
+
+    def __init__(self):
+        self.chunks = []
+        self.drained = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+
+    async def drain(self):
+        self.drained += 1
+
+
+@pytest.fixture
+def executor():
+    with CountingExecutor() as executor:
+        yield executor
+
+
+@pytest.mark.parametrize(
+    "obj, threshold, expected",
+    (
+        (1, 0, False),
+        ([], 0, False),
+        ([1, 2], 1, True),
+        ([1, 2], 2, False),
+        ({"a": [1, 2]}, 2, True),
+        ({"a": [1, 2]}, 3, False),
+        ([[1], (2, {"a": 3})], 4, True),
+    ),
+)
+def test_is_large(obj, threshold, expected):
+    assert is_large(obj, threshold) is expected
+
+
+def test_adumps_inline(executor):
+    data = {"date": date(2018, 1, 1), "items": [1, 2]}
+    assert asyncio.run(adumps(data, executor=executor)) == dumps(data)
+    assert executor.submitted == 0
+
+
+def test_adumps_offloaded(executor):
+    data = {"items": list(range(100))}
+    result = asyncio.run(adumps(data, threshold=10, executor=executor, indent=2))
+    assert result == dumps(data, indent=2)
+    assert executor.submitted == 1
+
+
+def test_adumps_no_threshold(executor):
+    data = list(range(100))
+    assert asyncio.run(adumps(data, threshold=None, executor=executor)) == dumps(data)
+    assert executor.submitted == 0
+
+
+def test_adumps_process_pool_records():
+    records = [Record(id=1, name="a"), Record(id=2, name="b")]
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        for data in (records, {"rows": records, "count": 2}):
+            result = asyncio.run(adumps(data, threshold=1, executor=executor))
+            assert result == dumps(data)
+
+
+class Money:
+    def __init__(self, amount, currency):
+        self.amount = amount
+        self.currency = currency
+
+
+def encode_money(obj):
+    return f"{obj.amount} {obj.currency}"
+
+
+def test_adumps_process_pool_registrations(registry):
+    register_encoder(Money, encode_money)
+    data = [Money(i, "EUR") for i in range(10)]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        result = asyncio.run(adumps(data, threshold=1, executor=executor))
+        assert result == dumps(data)
+        # Registered after the worker has started
+        register_encoder(Money, attrgetter("amount"))
+        result = asyncio.run(adumps(data, threshold=1, executor=executor))
+        assert result == dumps(data)
+
+
+def test_adump_chunks():
+    writer = Writer()
+    data = {"items": list(range(100))}
+    asyncio.run(adump(data, writer, chunk_size=64))
+    assert b"".join(writer.chunks) == dumps(data).encode()
+    assert len(writer.chunks) > 1
+    assert all(len(chunk) <= 64 for chunk in writer.chunks)
+
+
+def test_adump_drain(executor):
+    writer = StreamWriter()
+    data = {"name": "Kiwi ✈", "items": list(range(100))}
+    asyncio.run(adump(data, writer, chunk_size=64, threshold=10, executor=executor))
+    assert b"".join(writer.chunks) == dumps_bytes(data)
+    assert writer.drained == len(writer.chunks)
+    assert executor.submitted == 1
+
+
+def test_adump_yields_to_other_tasks():
+    events = []
+
+    async def other():
+        for _ in range(3):
+            events.append("other")
+            await asyncio.sleep(0)
+
+    class EventWriter:
+        async def write(self, data):  # pylint: disable=unused-argument
+            events.append("write")
+
+    async def main():
+        await asyncio.gather(
+            adump(list(range(100)), EventWriter(), chunk_size=32), other()
+        )
+
+    asyncio.run(main())
+    # The other task runs between the chunks, not after all of them
+    assert events[:3] == ["write", "other", "write"]
@@ -0,0 +1,125 @@
+import calendar
+import datetime
+
+import pytest
+from pytz import UTC, timezone
+
+from kw.json import KiwiJSONEncoder, MaskedJSONEncoder, dumps
+from kw.json.dates import make_date_encoder, unix_time
+from kw.json.exceptions import KiwiJsonError
+
+PRAGUE = timezone("Europe/Prague")
+NAIVE = datetime.datetime(2018, 1, 1, 12, 30, 15, 123456)
+AWARE = datetime.datetime(2018, 1, 1, 12, 30, 15, 123456, tzinfo=UTC)
+
+
+@pytest.mark.parametrize(
+    "value",
+    (
+        NAIVE,
+        AWARE,
+        PRAGUE.localize(NAIVE),
+        datetime.datetime(1969, 12, 31, 23, 59, 59),
+        datetime.date(2018, 1, 1),
+        datetime.date(1900, 3, 1),
+    ),
+)
+def test_unix_time(value):
+    assert unix_time(value) == calendar.timegm(value.timetuple())
+
+
+@pytest.mark.parametrize(
+    "options, value, expected",
+    (
+        ({}, NAIVE, "2018-01-01T12:30:15.123456"),
+        ({"timespec": "milliseconds"}, NAIVE, "2018-01-01T12:30:15.123"),
+        ({"timespec": "seconds"}, AWARE, "2018-01-01T12:30:15+00:00"),
+        ({"utc_suffix": "Z"}, AWARE, "2018-01-01T12:30:15.123456Z"),
+        (
+            {"utc_suffix": "Z", "timespec": "milliseconds"},
+            AWARE,
+            "2018-01-01T12:30:15.123Z",
+        ),
+        (
+            {"utc_suffix": "Z"},
+            PRAGUE.localize(NAIVE),
+            "2018-01-01T12:30:15.123456+01:00",
+        ),
+        ({"timespec": "seconds"}, datetime.date(2018, 1, 1), "2018-01-01"),
+        ({"timespec": "minutes"}, datetime.time(12, 30, 15), "12:30"),
+        ({"date_as_unix_time": True}, NAIVE, 1514809815),
+        ({"date_as_unix_time": True, "timespec": "seconds"}, AWARE, 1514809815),
+        (
+            {"date_as_unix_time": True, "timespec": "milliseconds"},
+            AWARE,
+            1514809815.123,
+        ),
+        (
+            {"date_as_unix_time": True, "timespec": "microseconds"},
+            NAIVE,
+            1514809815.123456,
+        ),
+        (
+            {"date_as_unix_time": True, "timespec": "milliseconds"},
+            datetime.date(2018, 1, 1),
+            1514764800,
+        ),
+    ),
+)
+def test_make_date_encoder(options, value, expected):
+    assert make_date_encoder(**options)(value) == expected
+    assert make_date_encoder(cache_size=0, **options)(value) == expected
+
+
+def test_make_date_encoder_cache():
+    encode = make_date_encoder(utc_suffix="Z")
+    # Equal datetimes in different timezones aren't mixed up
+    assert encode(AWARE) == "2018-01-01T12:30:15.123456Z"
+    assert encode(AWARE.astimezone(PRAGUE)) == "2018-01-01T13:30:15.123456+01:00"
+    assert encode(datetime.date(2018, 1, 1)) == "2018-01-01"
+    assert encode(datetime.datetime(2018, 1, 1)) == "2018-01-01T00:00:00"
+
+
+@pytest.mark.parametrize(
+    "options, message",
+    (
+        ({"timespec": "days"}, "Unknown timespec 'days'"),
+        (
+            {"timespec": "minutes", "date_as_unix_time": True},
+            "Unix time can't be encoded with timespec 'minutes'",
+        ),
+    ),
+)
+def test_make_date_encoder_invalid(options, message):
+    with pytest.raises(KiwiJsonError, match=message):
+        make_date_encoder(**options)
+
+
+def test_dumps():
+    assert dumps([AWARE], utc_suffix="Z", timespec="milliseconds") == (
+        '["2018-01-01T12:30:15.123Z"]'
+    )
+    assert (
+        dumps(
+            [AWARE], date_as_unix_time=True, timespec="milliseconds", backend="orjson"
+        )
+        == "[1514809815.123]"
+    )
+    assert dumps({"at": AWARE}, cls=MaskedJSONEncoder, utc_suffix="Z") == (
+        '{"at": "2018-01-01T12:30:15.123456Z"}'
+    )
+
+
+def test_encoder():
+    encoder = KiwiJSONEncoder(date_as_unix_time=True, timespec="milliseconds")
+    assert encoder.encode([NAIVE]) == "[1514809815.123]"
+    assert KiwiJSONEncoder(utc_suffix="Z").encode(AWARE) == (
+        '"2018-01-01T12:30:15.123456Z"'
+    )
+
+
+def test_dumps_with_default():
+    with pytest.raises(
+        TypeError, match="timespec, utc_suffix can't be used with default"
+    ):
+        dumps(AWARE, default=str, utc_suffix="Z", timespec="seconds")
@@ -1,19 +1,38 @@
+import datetime
+import enum
+import io
+import mmap
+import uuid
+from dataclasses import dataclass, field
 from decimal import Decimal
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    NewType,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
+import attr
 import pytest
 
-from kw.json import loads
+from kw.json import (
+    Decoder,
+    decode,
+    dumps,
+    load,
+    loads,
+    register_decoder,
+    register_fields,
+)
 from kw.json.exceptions import KiwiJsonError
 
-try:
-    from simplejson import loads as simplejson_loads
-except ImportError:
-    simplejson_loads = None
 
-
-@pytest.mark.skipif(
-    simplejson_loads is None, reason="Decimal encoding with simplejson only"
-)
 @pytest.mark.parametrize(
     "value, expected",
     [
@@ -26,11 +45,264 @@ except ImportError:
     ],
     # ids=["str", "int", "neg_int", "float", "long_float", "object"]
 )
-def test_simplejson_encoder_with_decimal(value, expected):
+def test_decoder_with_decimal(value, expected):
     assert loads(value, use_decimal=True) == expected
+    assert load(io.StringIO(value), use_decimal=True) == expected
+
+
+def test_decoder_without_decimal():
+    assert loads("0.1") == 0.1
+
+
+@attr.s
+class Passenger:
+    name = attr.ib(type=str)
+    _birthday = attr.ib(type=datetime.date, default=None)
+
+
+@dataclass
+class Leg:
+    departure: datetime.datetime
+    price: Decimal
+    passengers: List[Passenger] = field(default_factory=list)
+    fare: Optional["Fare"] = None
+
+
+@dataclass
+class Fare:
+    id: uuid.UUID
+    legs: Tuple[Leg, ...] = ()
+    prices: Dict[str, Decimal] = field(default_factory=dict)
+    tags: Set[str] = field(default_factory=set)
+    computed: int = field(default=0, init=False)
+
+
+class Cabin(enum.Enum):
+    ECONOMY = 1
+    BUSINESS = 2
+
+
+@dataclass
+class Seat:
+    cabin: Cabin
+    at: datetime.time
+
+
+class Priority(enum.IntEnum):
+    LOW = 1
+    HIGH = 2
+
+
+class Currency(str, enum.Enum):
+    EUR = "euro"
+    CZK = "koruna"
+
+
+@dataclass
+class Booking:
+    cabin: Cabin
+    priority: Priority
+    currency: Currency
+
+
+FARE_ID = uuid.UUID("4b1f6a2a-cd01-4f03-a6ba-6ec4ed6b8d52")
+
+
+def test_schema():
+    fare = Fare(
+        FARE_ID,
+        legs=(
+            Leg(
+                datetime.datetime(2018, 1, 1, 12, 30, tzinfo=datetime.timezone.utc),
+                Decimal("10.5"),
+                [Passenger("John", datetime.date(1990, 5, 1)), Passenger("Jane")],
+            ),
+        ),
+        prices={"adult": Decimal("1.25")},
+        tags={"cheap"},
+    )
+    assert loads(dumps(fare), schema=Fare) == fare
+    assert loads(dumps([fare]), schema=List[Fare]) == [fare]
+    assert load(io.StringIO(dumps(fare, shallow=True)), schema=Fare) == fare
+
+
+def test_schema_recursive():
+    leg = Leg(datetime.datetime(2018, 1, 1), Decimal("1"), fare=Fare(FARE_ID))
+    assert loads(dumps(leg), schema=Leg) == leg
+
+
+def test_schema_ignores_unknown_keys():
+    data = '{"name": "John", "_birthday": "1990-05-01", "age": 28}'
+    assert loads(data, schema=Passenger) == Passenger("John", datetime.date(1990, 5, 1))
+
+
+def test_schema_enum_and_time():
+    seat = Seat(Cabin.BUSINESS, datetime.time(12, 30))
+    assert dumps(seat) == '{"cabin": "BUSINESS", "at": "12:30:00"}'
+    assert loads(dumps(seat), schema=Seat) == seat
+
+
+def test_schema_enum_mixins():
+    booking = Booking(Cabin.ECONOMY, Priority.HIGH, Currency.CZK)
+    assert dumps(booking) == '{"cabin": "ECONOMY", "priority": 2, "currency": "koruna"}'
+    assert loads(dumps(booking), schema=Booking) == booking
+
+
+def test_schema_unix_time():
+    leg = Leg(datetime.datetime(2018, 1, 1, 12, 30), Decimal("1"))
+    assert loads(dumps(leg, date_as_unix_time=True), schema=Leg) == leg
+
+
+def test_schema_renamed_fields(field_options):
+    register_fields(Passenger, rename={"name": "fullName"}, omit=["_birthday"])
+    assert loads('{"fullName": "John", "_birthday": null}', schema=Passenger) == (
+        Passenger("John")
+    )
+
+
+def test_schema_decimal_precision():
+    data = '{"departure": "2018-01-01T00:00:00", "price": 0.123456789123456789}'
+    assert loads(data, schema=Leg).price == Decimal("0.12345678912345678")
+    assert loads(data, schema=Leg, use_decimal=True).price == Decimal(
+        "0.123456789123456789"
+    )
+
+
+def test_schema_constructor_cached(monkeypatch):
+    loads('{"id": null}', schema=Fare)
+    monkeypatch.setattr(decode, "_init_fields", None)
+    assert loads('{"id": null}', schema=Fare) == Fare(None)
+
+
+@pytest.mark.parametrize(
+    "schema, data, expected",
+    (
+        (
+            datetime.datetime,
+            '"2018-01-01T00:00:00Z"',
+            datetime.datetime(2018, 1, 1, tzinfo=datetime.timezone.utc),
+        ),
+        (datetime.date, "1514764800", datetime.date(2018, 1, 1)),
+        (Decimal, '"1.10"', Decimal("1.10")),
+        (Optional[uuid.UUID], "null", None),
+        (List[Optional[Decimal]], "[1, null]", [Decimal(1), None]),
+        (
+            Dict[int, datetime.date],
+            '{"1": "2018-01-01"}',
+            {1: datetime.date(2018, 1, 1)},
+        ),
+        (Tuple[int, Decimal], "[1, 2]", (1, Decimal(2))),
+        (Tuple[int, ...], "[1, 2]", (1, 2)),
+        (Tuple[int, str], '[1, "a"]', (1, "a")),
+        (tuple, "[1]", (1,)),
+        (Any, "[1]", [1]),
+        (TypeVar("T"), "[1]", [1]),
+        (NewType("Price", Decimal), '"1.5"', Decimal("1.5")),
+        (FrozenSet[str], '["a"]', frozenset(["a"])),
+        (List[int], "[1]", [1]),
+        (Union[int, str], "1", 1),
+        (lambda value: value * 2, "1", 2),
+    ),
+)
+def test_schema_types(schema, data, expected):
+    assert loads(data, schema=schema) == expected
+
+
+@dataclass
+class Itinerary:
+    legs: Tuple[int, ...]
+    pair: Tuple[int, str]
+    extra: Any = None
+
+
+def test_schema_round_trip():
+    itinerary = Itinerary((1, 2), (3, "a"), {"any": [1]})
+    assert loads(dumps(itinerary), schema=Itinerary) == itinerary
+
+
+def test_converters():
+    data = '{"id": "4b1f6a2a-cd01-4f03-a6ba-6ec4ed6b8d52", "items": [{"departure_at": "2018-01-01T00:00:00", "price": 1.5, "cabin": null}]}'
+    assert loads(
+        data,
+        converters={"id": uuid.UUID, "price": Decimal, "cabin": Cabin},
+        patterns={"_at$": datetime.datetime},
+    ) == {
+        "id": FARE_ID,
+        "items": [
+            {
+                "departure_at": datetime.datetime(2018, 1, 1),
+                "price": Decimal("1.5"),
+                "cabin": None,
+            }
+        ],
+    }
+
+
+def test_converters_with_object_hook():
+    decoder = Decoder(
+        converters={"price": Decimal}, object_hook=lambda obj: sorted(obj.items())
+    )
+    assert decoder.loads('{"price": 1.5, "a": 1}') == [
+        ("a", 1),
+        ("price", Decimal("1.5")),
+    ]
+
+
+def test_converters_unknown_type():
+    with pytest.raises(KiwiJsonError, match="can't be decoded"):
+        Decoder(converters={"name": str})
+
+
+def test_decoder():
+    decoder = Decoder(Leg, converters={"when": datetime.date})
+    leg = decoder.loads(
+        '{"departure": "2018-01-01T00:00:00", "price": 1, "x": {"when": "2018-01-01"}}'
+    )
+    assert leg == Leg(datetime.datetime(2018, 1, 1), Decimal(1))
+    assert decoder.load(io.StringIO('{"departure": "2018-01-01", "price": "1"}')) == leg
+    assert decoder.convert(None) is None
+
+
+def test_register_decoder():
+    class Money:
+        def __init__(self, amount, currency):
+            self.amount, self.currency = amount, currency
+
+    @register_decoder(Money)
+    def decode_money(value):
+        amount, currency = value.split()
+        return Money(Decimal(amount), currency)
+
+    try:
+        money = loads('{"price": "10 EUR"}', converters={"price": Money})["price"]
+        assert (money.amount, money.currency) == (Decimal(10), "EUR")
+    finally:
+        del decode._registry[Money]
+
+
+@pytest.mark.parametrize("wrap", (bytes, bytearray, memoryview))
+@pytest.mark.parametrize("backend", (None, "json", "orjson"))
+def test_loads_buffers(wrap, backend):
+    document = wrap('{"name": "čau", "price": 1.5}'.encode())
+    expected = {"name": "čau", "price": 1.5}
+    assert loads(document, backend=backend) == expected
+    assert loads(document, backend=backend, use_decimal=True) == {
+        "name": "čau",
+        "price": Decimal("1.5"),
+    }
+    assert loads(document, backend=backend, schema=Dict[str, str]) == {
+        "name": "čau",
+        "price": 1.5,
+    }
 
 
-@pytest.mark.skipif(simplejson_loads, reason="Standard json module only")
-def test_json_with_use_decimal_argument():
-    with pytest.raises(KiwiJsonError, match=r".*Decimal.*"):
-        loads("{}", use_decimal=True)
+@pytest.mark.parametrize("backend", (None, "orjson"))
+def test_loads_mmap(tmp_path, backend):
+    path = tmp_path / "document.json"
+    path.write_bytes(b'{"a": [1, 2]}')
+    with path.open("rb") as fp, mmap.mmap(
+        fp.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        assert loads(mm, backend=backend) == {"a": [1, 2]}
+        assert loads(mm, select=["a.1"]) == {"a": [2]}
+        assert load(mm, backend=backend) == {"a": [1, 2]}
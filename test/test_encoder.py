@@ -1,8 +1,13 @@
 import datetime
+import gc
+import io
 import os
 import sys
 import uuid
+import weakref
 from collections import namedtuple
+from collections.abc import Collection, Sized
+from dataclasses import dataclass
 from decimal import Decimal
 from functools import partial
 from json import dumps as json_dumps
@@ -20,14 +25,24 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from kw.json import (
+    Encoder,
     KiwiJSONEncoder,
     MaskedJSONEncoder,
     default_encoder,
     dump,
     dumps,
+    dumps_bytes,
+    iterdumps,
+    mask_dict,
     raw_encoder,
+    register_encoder,
+    register_fields,
+    set_backend,
 )
-from kw.json._compat import DataclassItem, enum
+from kw.json import encode
+from kw.json._compat import BaseJSONEncoder, enum, get_orjson
+from kw.json._iterencode import NotNative, make_iterencode, make_prepare
+from kw.json.encode import format_value
 from kw.json.exceptions import KiwiJsonError
 
 try:
@@ -35,6 +50,8 @@ try:
 except ImportError:
     simplejson_dumps = None
 
+orjson = get_orjson()
+
 
 Base = declarative_base()
 
@@ -52,6 +69,11 @@ class Custom:
     pass
 
 
+@dataclass
+class DataclassItem:
+    attrib: int
+
+
 Namedtuple = namedtuple("Namedtuple", ["a", "b"])
 test_namedtuple = Namedtuple(1.3333, 2.3333)
 test_namedtuple_complex = Namedtuple(1.3333, Namedtuple(1.3333, {1: 1.3333}))
@@ -104,25 +126,67 @@ def test_default_encoder(value, expected, date_as_unix_time):
     assert default_encoder(value, date_as_unix_time=date_as_unix_time) == expected
 
 
-@pytest.mark.skipif(
-    simplejson_dumps is None, reason="Decimal encoding with simplejson only"
-)
 @pytest.mark.parametrize(
     "value, expected",
     (
         (Decimal("1"), "1"),
         (Decimal("-1"), "-1"),
         (Decimal("0.123456789123456789"), "0.123456789123456789"),
+        (
+            {"price": Decimal("1.10"), "items": [Decimal("-1E+3"), "1.10"]},
+            '{"price": 1.10, "items": [-1E+3, "1.10"]}',
+        ),
+    ),
+)
+@pytest.mark.parametrize(
+    "kwargs",
+    (
+        {},
+        {"indent": None, "check_circular": False},
+        {"precision": 2},
+        {"cls": KiwiJSONEncoder},
     ),
 )
-def test_simplejson_encoder_with_decimal(value, expected):
-    assert dumps(value, use_decimal=True) == expected
+def test_encoder_with_decimal(value, expected, kwargs):
+    assert dumps(value, use_decimal=True, **kwargs) == expected
+    assert "".join(iterdumps(value, use_decimal=True, **kwargs)) == expected
+
+
+def test_encoder_with_decimal_indent():
+    value = {"price": Decimal("1.10"), "currency": "EUR"}
+    assert dumps(value, use_decimal=True, indent=2) == (
+        '{\n  "price": 1.10,\n  "currency": "EUR"\n}'
+    )
+    assert dumps(value, use_decimal=True, ensure_ascii=False) == (
+        '{"price": 1.10, "currency": "EUR"}'
+    )
+
+
+def test_encoder_with_decimal_default():
+    value = [Decimal("1.1"), datetime.date(2018, 1, 1), {1, 2}]
+    assert dumps(value, use_decimal=True) == '[1.1, "2018-01-01", [1, 2]]'
+    assert dumps(value, cls=MaskedJSONEncoder, use_decimal=True) == (
+        '[1.1, "2018-01-01", [1, 2]]'
+    )
 
 
 @pytest.mark.skipif(simplejson_dumps is not None, reason="Standard json only")
 def test_json_with_use_decimal_argument():
     with pytest.raises(KiwiJsonError, match=r".*Decimal.*"):
-        dumps(Decimal(0), use_decimal=True)
+        dumps(Decimal(0), use_decimal=True, cls=CustomJSONEncoder)
+
+
+def test_dumps_foreign_encoder_class():
+    value = {"d": datetime.date(2018, 1, 1)}
+    assert dumps(value, cls=BaseJSONEncoder) == '{"d": "2018-01-01"}'
+    assert dumps(value, cls=BaseJSONEncoder, date_as_unix_time=True) == (
+        '{"d": 1514764800}'
+    )
+
+
+def test_dumps_workers_keyword_only():
+    with pytest.raises(TypeError):
+        dumps([1], True)  # pylint: disable=too-many-function-args
 
 
 def test_default_encoder_defaults():
@@ -192,6 +256,125 @@ def test_rounding(values, expected, precision):
         assert before == after
 
 
+@dataclass
+class FloatItem:
+    value: float
+
+
+class CustomJSONEncoder(BaseJSONEncoder):
+    pass
+
+
+@pytest.mark.parametrize(
+    "value, kwargs, expected",
+    (
+        # Float keys are not rounded, the same way as before encoding
+        ({1.333: 1.333}, {}, '{"1.333": 1.33}'),
+        (
+            [float("nan"), float("inf"), 1.005],
+            {"allow_nan": True},
+            "[NaN, Infinity, 1.0]",
+        ),
+        ([1.5, 2.5], {"precision": 0}, "[2.0, 2.0]"),
+        ([FloatItem(1.333)], {}, '[{"value": 1.33}]'),
+        ([1.333], {"precision": None}, "[1.333]"),
+        ([1.333], {"precision": False}, "[1.333]"),
+        ({"a": [1.333]}, {"indent": 2}, '{\n  "a": [\n    1.33\n  ]\n}'),
+        (
+            {"a": {"secret": 1.333, "b": 1.333}},
+            {"cls": MaskedJSONEncoder, "recursive": True},
+            '{"a": {"secret": "-- MASKED --", "b": 1.33}}',
+        ),
+        # Encoders unaware of precision get the data rounded upfront
+        ({"a": [1.333]}, {"cls": CustomJSONEncoder}, '{"a": [1.33]}'),
+    ),
+)
+def test_rounding_while_encoding(value, kwargs, expected):
+    kwargs.setdefault("precision", 2)
+    assert dumps(value, **kwargs) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    (
+        {"a": [1.333, None, True, "ř", {"secret": {"b": 2.555}}], "c": (1.5, {})},
+        [float("nan"), float("inf"), -0.0, 10**20, 1e300],
+        {1: {"token": 1}, "a": 1.333},
+        [test_namedtuple, 1.333],
+        {"a": [{"b": 1.333}], "c": FloatItem(1.333)},
+    ),
+)
+@pytest.mark.parametrize("indent", (None, 2))
+@pytest.mark.parametrize(
+    "kwargs",
+    ({"precision": 2}, {"recursive": True}, {"precision": 1, "recursive": True}),
+)
+def test_prepare_native(value, indent, kwargs):
+    cls = MaskedJSONEncoder if "recursive" in kwargs else KiwiJSONEncoder
+    encoder = cls(indent=indent, allow_nan=True, **kwargs)
+    expected = "".join(make_iterencode(encoder, **encoder.iterencode_hooks())(value, 0))
+    before = repr(value)
+    assert encoder.encode(value) == expected
+    # The data is copied where it changes, not modified
+    assert repr(value) == before
+
+
+def test_prepare_native_fallback():
+    prepare = make_prepare(KiwiJSONEncoder(), precision=2)
+    value = {"a": [1, "b"], "c": {"d": None}}
+    assert prepare(value) is value
+    assert prepare([1.333, [1]]) == [1.33, [1]]
+    # Objects are replaced by what `default` returns for them
+    assert prepare([FloatItem(1.333), datetime.date(2018, 1, 1)]) == [
+        {"value": 1.33},
+        "2018-01-01",
+    ]
+    with pytest.raises(NotNative):
+        prepare([(i for i in [])])
+    circular = []
+    circular.append(circular)
+    with pytest.raises(NotNative):
+        prepare(circular)
+    with pytest.raises(ValueError, match="Circular reference"):
+        dumps(circular, precision=2)
+
+
+def test_kiwi_json_encoder_precision():
+    assert (
+        KiwiJSONEncoder(precision=1).encode({"a": (1.25, 1.35)}) == '{"a": [1.2, 1.4]}'
+    )
+    assert KiwiJSONEncoder().encode([1.25]) == "[1.25]"
+
+
+def test_kiwi_json_encoder_hooks_built_once(monkeypatch):
+    encoder = KiwiJSONEncoder(precision=2)
+    value = {"at": datetime.date(2018, 1, 1), "price": 1.2345}
+    assert encoder.encode(value) == '{"at": "2018-01-01", "price": 1.23}'
+    monkeypatch.setattr(encode, "make_prepare", None)
+    monkeypatch.setattr(encode, "make_iterencode", None)
+    assert encoder.encode(value) == '{"at": "2018-01-01", "price": 1.23}'
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    (
+        {},
+        {"cls": CustomJSONEncoder},
+        pytest.param(
+            {"backend": "orjson"},
+            marks=pytest.mark.skipif(orjson is None, reason="orjson is not installed"),
+        ),
+    ),
+)
+def test_rounding_default_output(kwargs):
+    # Floats returned by `default` are rounded by all the encoders
+    value = {"item": FloatItem(1.23456), "items": [FloatItem(2.34567)]}
+    assert loads(dumps(value, precision=2, **kwargs)) == {
+        "item": {"value": 1.23},
+        "items": [{"value": 2.35}],
+    }
+
+
 @pytest.mark.parametrize(
     "values, expected, precision",
     (
@@ -224,6 +407,117 @@ def test_rounding_tuples(values, expected, precision):
     assert before == after
 
 
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+@pytest.mark.parametrize(
+    "value, kwargs, expected",
+    (
+        ({1}, {}, "[1]"),
+        (Decimal("1"), {}, '"1"'),
+        (UUID, {}, f'"{str(UUID)}"'),
+        (datetime.datetime(2018, 1, 1), {}, '"2018-01-01T00:00:00"'),
+        (
+            datetime.datetime(2018, 1, 1, tzinfo=UTC),
+            {},
+            '"2018-01-01T00:00:00+00:00"',
+        ),
+        (datetime.datetime(2018, 1, 1), {"date_as_unix_time": True}, "1514764800"),
+        (arrow.get("2018-01-01"), {"date_as_unix_time": True}, "1514764800.0"),
+        (HTML(), {}, '"foo"'),
+        (items_view, {}, '{"foo":1}'),
+        ({1: 1.333, "b": [2.333]}, {"precision": 2}, '{"1":1.33,"b":[2.33]}'),
+        ({"b": 1, "a": 2}, {"sort_keys": True}, '{"a":2,"b":1}'),
+        ({"a": [1]}, {"indent": 2}, '{\n  "a": [\n    1\n  ]\n}'),
+        (DataclassItem(attrib=1), {}, '{"attrib":1}'),
+        (
+            {"secret": DataclassItem(attrib=1), "nested": {"secret": "a"}},
+            {"cls": MaskedJSONEncoder},
+            '{"secret":"-- MASKED --","nested":{"secret":"a"}}',
+        ),
+        ((1, 2), {}, "[1,2]"),
+        (test_namedtuple, {"namedtuple_as_object": False}, "[1.3333,2.3333]"),
+        (test_namedtuple, {"namedtuple_as_object": True}, '{"a":1.3333,"b":2.3333}'),
+    ),
+)
+def test_dumps_orjson_backend(value, kwargs, expected):
+    assert dumps(value, backend="orjson", **kwargs) == expected
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+def test_dumps_orjson_backend_fallback():
+    # Options that orjson can't honour are encoded with the "json" backend
+    value = {"a": "á"}
+    assert dumps(value, backend="orjson", ensure_ascii=True) == dumps(value)
+    assert dumps(value, backend="orjson", indent=4) == dumps(value, indent=4)
+    assert dumps(value, backend="orjson", separators=(", ", ": ")) == dumps(value)
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+def test_set_backend():
+    try:
+        set_backend("orjson")
+        assert dumps({"a": 1}) == '{"a":1}'
+    finally:
+        set_backend("json")
+    assert dumps({"a": 1}) == '{"a": 1}'
+
+
+def test_unknown_backend():
+    with pytest.raises(KiwiJsonError, match="Unknown backend"):
+        dumps({}, backend="foo")
+    with pytest.raises(KiwiJsonError, match="Unknown backend"):
+        set_backend("foo")
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+def test_dump_orjson_backend(tmpdir):
+    filename = str(tmpdir.join("test_file.json"))
+    with open(filename, "w+", encoding="UTF-8") as fp:
+        dump({"date": datetime.date(2018, 1, 1)}, fp, backend="orjson")
+        fp.seek(0, 0)
+        assert fp.read() == '{"date":"2018-01-01"}'
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+@pytest.mark.parametrize("kwargs", ({}, {"indent": 2}, {"sort_keys": True}))
+def test_iterdumps_orjson_backend(kwargs):
+    value = {"name": "čau", "at": datetime.date(2018, 1, 1), "items": [1, {"a": None}]}
+    expected = dumps(value, backend="orjson", **kwargs)
+    assert "".join(iterdumps(value, backend="orjson", **kwargs)) == expected
+    # Iterators are streamed, orjson can't encode them
+    fp = io.StringIO()
+    dump({**value, "items": iter(value["items"])}, fp, backend="orjson", **kwargs)
+    assert fp.getvalue() == expected
+
+
+def test_format_value_keeps_namedtuple_types(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("namedtuple class should not be created")
+
+    monkeypatch.setattr(encode, "namedtuple", fail)
+    rows = [Namedtuple(1.3333, i) for i in range(1000)]
+
+    result = format_value(rows, 2)
+
+    assert all(type(row) is Namedtuple for row in result)
+    assert result[0] == Namedtuple(1.33, 0)
+    assert rows[0] == Namedtuple(1.3333, 0)
+
+
+class FieldsTuple(tuple):
+    _fields = ("a", "b")
+
+    def _asdict(self):
+        return dict(zip(self._fields, self))
+
+
+def test_format_value_tuple_with_fields():
+    result = [format_value(FieldsTuple((1.3333, 2)), 2) for _ in range(2)]
+    assert result[0] == (1.33, 2)
+    assert result[0]._fields == ("a", "b")
+    # The generated class is reused
+    assert type(result[0]) is type(result[1])
+
+
 def test_date_as_unix_time_default():
     # When `date_as_unix_time` is not passed, then it is disabled and dates are converted as ISO
     assert dumps(datetime.date(2018, 1, 1)) == '"2018-01-01"'
@@ -272,6 +566,123 @@ def test_dump(tmpdir, value, expected):
         assert json_load(fp) == expected
 
 
+@pytest.mark.parametrize(
+    "value, kwargs, expected",
+    (
+        ((i for i in range(3)), {}, "[0, 1, 2]"),
+        ({"a": iter([]), "b": map(str, [1])}, {}, '{"a": [], "b": ["1"]}'),
+        ({"a": (i * 1.333 for i in range(2))}, {"precision": 2}, '{"a": [0.0, 1.33]}'),
+        ({"date": datetime.date(2018, 1, 1)}, {}, '{"date": "2018-01-01"}'),
+        (datetime.date(2018, 1, 1), {"date_as_unix_time": True}, "1514764800"),
+        ((i for i in range(2)), {"indent": 2}, "[\n  0,\n  1\n]"),
+        (
+            ({"token": i} for i in range(1)),
+            {"cls": MaskedJSONEncoder, "recursive": True},
+            '[{"token": "-- MASKED --"}]',
+        ),
+        ({"secret": 1}, {"cls": MaskedJSONEncoder}, '{"secret": "-- MASKED --"}'),
+        (
+            {"a": Decimal("1.5")},
+            {"cls": CustomJSONEncoder, "default": str},
+            '{"a": "1.5"}',
+        ),
+    ),
+)
+def test_iterdumps(value, kwargs, expected):
+    assert "".join(iterdumps(value, **kwargs)) == expected
+
+
+def test_iterdumps_chunks():
+    rows = ({"id": i, "name": "x" * 10} for i in range(10000))
+
+    chunks = list(iterdumps(rows, chunk_size=1024))
+
+    assert len(chunks) > 100
+    # Chunks are cut once they reach `chunk_size`, by at most one row
+    assert all(len(chunk) < 1100 for chunk in chunks)
+    assert loads("".join(chunks)) == [{"id": i, "name": "x" * 10} for i in range(10000)]
+
+
+def test_dump_iterator(tmpdir):
+    filename = str(tmpdir.join("test_file.json"))
+    with open(filename, "w+", encoding="UTF-8") as fp:
+        dump({"items": (i for i in range(3))}, fp, precision=2)
+        fp.seek(0, 0)
+        assert json_load(fp) == {"items": [0, 1, 2]}
+
+
+@pytest.mark.skipif(simplejson_dumps is not None, reason="Standard json only")
+def test_iterdumps_with_use_decimal_argument():
+    with pytest.raises(KiwiJsonError, match=r".*Decimal.*"):
+        iterdumps(Decimal(0), use_decimal=True, cls=CustomJSONEncoder)
+
+
+def test_encoder():
+    encoder = Encoder(date_as_unix_time=True, precision=2)
+    value = {"at": datetime.date(2018, 1, 1), "price": 1.2345}
+
+    assert encoder.dumps(value) == '{"at": 1514764800, "price": 1.23}'
+    assert (
+        "".join(encoder.iterdumps(iter([value])))
+        == '[{"at": 1514764800, "price": 1.23}]'
+    )
+    fp = io.StringIO()
+    encoder.dump(value, fp)
+    assert fp.getvalue() == '{"at": 1514764800, "price": 1.23}'
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+def test_encoder_orjson_backend():
+    encoder = Encoder(backend="orjson", precision=2)
+    value = {"at": datetime.date(2018, 1, 1), "price": 1.2345}
+
+    assert encoder.dumps(value) == '{"at":"2018-01-01","price":1.23}'
+    # Streaming is done by the "json" backend in the layout of orjson
+    assert "".join(encoder.iterdumps(value)) == '{"at":"2018-01-01","price":1.23}'
+
+
+@pytest.mark.parametrize(
+    "value, kwargs",
+    (
+        ({"name": "čau", "price": 1.2345}, {}),
+        ({"name": "čau", "price": 1.2345}, {"ensure_ascii": False, "precision": 2}),
+        ({"at": datetime.date(2018, 1, 1)}, {"cls": MaskedJSONEncoder, "indent": 2}),
+        ([{"id": i, "name": "x" * 10} for i in range(1000)], {}),
+        ("string", {}),
+    ),
+)
+def test_dumps_bytes(value, kwargs):
+    expected = dumps(value, **kwargs).encode("utf-8")
+    assert dumps_bytes(value, **kwargs) == expected
+
+    buffer = bytearray(b"previous output")
+    assert dumps_bytes(value, buffer, **kwargs) is buffer
+    assert buffer == expected
+    assert Encoder(**kwargs).dumps_bytes(value, buffer, chunk_size=16) == expected
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+def test_dumps_bytes_orjson_backend():
+    value = {"name": "čau", "at": datetime.date(2018, 1, 1)}
+    expected = orjson.dumps({"name": "čau", "at": "2018-01-01"})
+    assert dumps_bytes(value, backend="orjson") == expected
+    buffer = bytearray()
+    assert dumps_bytes(value, buffer, backend="orjson") == expected
+
+
+def test_dumps_encoder_cache():
+    encode._cached_encoder.cache_clear()
+    dumps({}, sort_keys=True, precision=2)
+    dumps({}, precision=2, sort_keys=True)
+    dumps({}, sort_keys=True, precision=2, separators=[",", ":"])  # not hashable
+
+    info = encode._cached_encoder.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    # False is not mistaken for 0
+    assert dumps(1.5, precision=0) == "2.0"
+    assert dumps(1.5, precision=False) == "1.5"
+
+
 @pytest.mark.skipif(enum is None, reason="Enum is not available")
 def test_enum():
     class SomeEnum(enum.Enum):
@@ -307,6 +718,68 @@ def test_unknown_raises():
         default_encoder(Foo())
 
 
+class Money:
+    def __init__(self, amount, currency):
+        self.amount = amount
+        self.currency = currency
+
+
+class Fare(Money):
+    pass
+
+
+def test_register_encoder(registry):
+    register_encoder(Money, lambda obj: f"{obj.amount} {obj.currency}")
+
+    assert default_encoder(Money(10, "EUR")) == "10 EUR"
+    # Subclasses are dispatched through their MRO
+    assert default_encoder(Fare(20, "CZK")) == "20 CZK"
+    assert dumps({"price": Fare(20, "CZK")}) == '{"price": "20 CZK"}'
+
+
+def test_register_encoder_overrides_builtin(registry):
+    class Price(Decimal):
+        pass
+
+    @register_encoder(Price)
+    def encode_price(obj):
+        return float(obj)
+
+    assert default_encoder(Price("1.5")) == 1.5
+    # Other Decimals keep the built-in behavior
+    assert default_encoder(Decimal("1.5")) == "1.5"
+
+
+class Basket:
+    """Virtual subclass of `Sized` and `Collection`, they check the methods only."""
+
+    def __init__(self, *items):
+        self.items = items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __contains__(self, item):
+        return item in self.items
+
+
+class Cart(Basket):
+    pass
+
+
+def test_register_encoder_abc(registry):
+    register_encoder(Sized, len)
+    register_encoder(Collection, list)
+    # The most derived ABC wins, regardless of the order of registration
+    assert default_encoder(Basket(1, 2)) == [1, 2]
+    # Classes in the MRO win over ABCs
+    register_encoder(Basket, lambda obj: "basket")
+    assert default_encoder(Cart(1)) == "basket"
+
+
 @pytest.mark.parametrize(
     "value, expected",
     (
@@ -322,6 +795,51 @@ def test_masked_json_encoders(value, expected):
     assert _dumps(value, cls=MaskedJSONEncoder) == expected
 
 
+@pytest.mark.parametrize(
+    "value, expected",
+    (
+        ({"secret": "FOOO"}, '{"secret": "-- MASKED --"}'),
+        (
+            {"data": {"password": {"nested": 1}, "booking_token": "FOOO"}},
+            '{"data": {"password": "-- MASKED --", "booking_token": "FOOO"}}',
+        ),
+        (
+            [{"token": "FOOO"}, ({"api_key": "FOOO", "other": 1.5},)],
+            '[{"token": "-- MASKED --"}, [{"api_key": "-- MASKED --", "other": 1.5}]]',
+        ),
+        (items_view, '{"foo": 1}'),
+        ({1: {"Secret": None}}, '{"1": {"Secret": "-- MASKED --"}}'),
+    ),
+)
+def test_masked_json_encoder_recursive(value, expected):
+    assert dumps(value, cls=MaskedJSONEncoder, recursive=True) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    (
+        {"a": [1, 2.5, None, True, False, "ř", {"b": []}], "c": {}, 3: 4, None: 1},
+        [[], {}, (1, 2), test_namedtuple, set(), Decimal("1")],
+        {"date": datetime.date(2018, 1, 1), "item": DataclassItem(attrib=1)},
+        "foo",
+    ),
+)
+@pytest.mark.parametrize("indent", (None, 2))
+def test_masked_json_encoder_recursive_output(value, indent):
+    # Without masked keys the output is the same as the one of the native encoder
+    assert dumps(value, cls=MaskedJSONEncoder, recursive=True, indent=indent) == dumps(
+        value, cls=KiwiJSONEncoder, indent=indent
+    )
+
+
+def test_dump_masked_json_encoder_recursive(tmpdir):
+    filename = str(tmpdir.join("test_file.json"))
+    with open(filename, "w+", encoding="UTF-8") as fp:
+        dump({"a": {"secret": 1}}, fp, cls=MaskedJSONEncoder, recursive=True)
+        fp.seek(0, 0)
+        assert json_load(fp) == {"a": {"secret": "-- MASKED --"}}
+
+
 @pytest.mark.parametrize(
     "dumper, expected",
     (
@@ -348,6 +866,142 @@ def test_attrs(dumper, expected):
     assert dumper(AttrsItem(attrib=1)) == expected
 
 
+@dataclass
+class Leg:
+    price: float
+    at: datetime.date
+
+
+@dataclass
+class Itinerary:
+    legs: list
+    passenger: AttrsItem
+
+
+@attr.s(slots=True)
+class SlotsItem:
+    first = attr.ib()
+    second = attr.ib()
+
+
+ITINERARY = Itinerary(
+    legs=[Leg(1.5, datetime.date(2018, 1, 1)), Leg(2.5, datetime.date(2018, 1, 2))],
+    passenger=AttrsItem(attrib=1),
+)
+
+
+@pytest.mark.parametrize(
+    "value",
+    (DataclassItem(attrib=1), AttrsItem(attrib=1), SlotsItem(1, [2]), ITINERARY),
+)
+def test_shallow(value):
+    assert dumps(value, shallow=True) == dumps(value)
+    assert loads(dumps(value, shallow=True, backend="orjson")) == loads(dumps(value))
+
+
+def test_shallow_default_encoder():
+    encoded = default_encoder(ITINERARY, shallow=True)
+    # Nested values are left to the JSON encoder instead of being copied
+    assert encoded == {"legs": ITINERARY.legs, "passenger": ITINERARY.passenger}
+    assert encoded["legs"] is ITINERARY.legs
+    assert default_encoder(SlotsItem(1, 2), mask_dict, shallow=True) == {
+        "first": 1,
+        "second": 2,
+    }
+
+
+def test_shallow_masked():
+    value = SlotsItem(first={"password": "secret"}, second=AttrsItem(attrib=1))
+    assert (
+        dumps(value, cls=MaskedJSONEncoder, shallow=True)
+        == '{"first": {"password": "secret"}, "second": {"attrib": 1}}'
+    )
+    assert (
+        dumps(value, cls=MaskedJSONEncoder, recursive=True, shallow=True)
+        == '{"first": {"password": "-- MASKED --"}, "second": {"attrib": 1}}'
+    )
+
+
+@dataclass
+class Account:
+    login: str
+    token: str
+    internal: int
+
+
+@attr.s(slots=True)
+class AttrsAccount:
+    login = attr.ib()
+    token = attr.ib()
+    internal = attr.ib()
+
+
+@dataclass
+class AdminAccount(Account):
+    role: str = "admin"
+
+
+@pytest.mark.parametrize("cls", (Account, AttrsAccount))
+def test_register_fields(field_options, cls):
+    register_fields(
+        cls, rename={"login": "userName"}, omit=["internal"], mask=["login"]
+    )
+    account = cls("kiwi", "secret", 1)
+    assert default_encoder(account) == {"userName": "-- MASKED --", "token": "secret"}
+    assert raw_encoder(account) == {"userName": "-- MASKED --", "token": "-- MASKED --"}
+    assert dumps(account, cls=MaskedJSONEncoder) == (
+        '{"userName": "-- MASKED --", "token": "-- MASKED --"}'
+    )
+    assert dumps([account], cls=KiwiJSONEncoder) == (
+        '[{"userName": "-- MASKED --", "token": "secret"}]'
+    )
+
+
+def test_register_fields_subclass(field_options):
+    register_fields(Account, omit=["token", "internal"])
+    assert default_encoder(AdminAccount("kiwi", "secret", 1)) == {
+        "login": "kiwi",
+        "role": "admin",
+    }
+
+
+def test_register_fields_invalid(field_options):
+    with pytest.raises(KiwiJsonError, match="Custom is not a dataclass"):
+        register_fields(Custom)
+    with pytest.raises(KiwiJsonError, match="Account has no fields password"):
+        register_fields(Account, mask=["password"])
+
+
+def test_field_plan_cached(field_options, monkeypatch):
+    plan = encode.get_field_plan(Account)
+    assert plan.names == plan.keys == ("login", "token", "internal")
+    assert plan.getter(Account("kiwi", "secret", 1)) == ("kiwi", "secret", 1)
+    assert encode.get_field_plan(Account) is plan
+
+    accounts = [Account("kiwi", "secret", i) for i in range(3)]
+    assert default_encoder(accounts[0], shallow=True)["internal"] == 0
+    # Classes are inspected only once, not for every instance
+    monkeypatch.setattr(encode, "get_field_plan", None)
+    assert [raw_encoder(account, shallow=True) for account in accounts] == [
+        {"login": "kiwi", "token": "-- MASKED --", "internal": i} for i in range(3)
+    ]
+
+
+def test_dispatch_cache_bounded(registry, monkeypatch):
+    monkeypatch.setattr(encode, "_DISPATCH_CACHE_SIZE", 2)
+    for shallow in (False, True):
+        cls = dataclass(type("Temporary", (), {"__annotations__": {"a": int}}))
+        assert default_encoder(cls(1), shallow=shallow) == {"a": 1}
+        ref = weakref.ref(cls)
+        del cls
+        for value in (datetime.date(2018, 1, 1), Decimal("1.5")):
+            default_encoder(value, shallow=shallow)
+        gc.collect()
+        assert ref() is None
+    assert len(encode._dispatch_cache) <= 2
+    assert len(encode._shallow_dispatch_cache) <= 2
+
+
 @pytest.fixture
 def alchemy_session():
     engine = create_engine("sqlite:///:memory:")
@@ -377,11 +1031,11 @@ def test_sqlalchemy_cursor_row(alchemy_session):
     assert_json(data, [{"id": 1, "name": "test"}])
 
 
-def test_no_attrs():
+def test_no_attrs(monkeypatch):
     # Need to re-import
-    del sys.modules["kw.json"]
-    del sys.modules["kw.json.encode"]
-    sys.modules["attr"] = None
+    monkeypatch.delitem(sys.modules, "kw.json")
+    monkeypatch.delitem(sys.modules, "kw.json.encode")
+    monkeypatch.setitem(sys.modules, "attr", None)
     from kw.json import (  # pylint: disable=reimported,import-outside-toplevel
         default_encoder,
     )
@@ -1,5 +1,11 @@
-from flask import Flask, json
+import datetime
+from decimal import Decimal
 
+import pytest
+from flask import Flask, json, jsonify, request, session
+
+from kw.json import MaskedJSONEncoder, mask_dict
+from kw.json.exceptions import KiwiJsonError
 from kw.json.flask import JSONExtension
 
 items = {"secret": "foo"}.items()
@@ -15,3 +21,142 @@ def test_mask_dict():
 
 def test_create_extension_without_app():
     assert JSONExtension().app is None
+
+
+def test_response_bytes():
+    app = Flask(__name__)
+    JSONExtension(app, dict_factory=mask_dict)
+
+    @app.route("/")
+    def index():
+        return jsonify(
+            {"user": items, "price": Decimal("1.5"), "at": datetime.date(2018, 1, 1)}
+        )
+
+    response = app.test_client().get("/")
+    assert response.data == (
+        b'{"at":"2018-01-01","price":"1.5","user":{"secret":"-- MASKED --"}}\n'
+    )
+    assert response.content_length == len(response.data)
+    assert response.mimetype == "application/json"
+
+
+def test_response_dict_factory_date_options():
+    app = Flask(__name__)
+    JSONExtension(app, dict_factory=mask_dict, date_as_unix_time=True)
+
+    @app.route("/")
+    def index():
+        return jsonify({"user": items, "at": datetime.date(2018, 1, 1)})
+
+    response = app.test_client().get("/")
+    assert response.data == b'{"at":1514764800,"user":{"secret":"-- MASKED --"}}\n'
+    with app.app_context():
+        # The options are of the responses only
+        assert json.dumps({"at": datetime.date(2018, 1, 1)}) == '{"at": "2018-01-01"}'
+
+
+def test_custom_encoder_date_options():
+    with pytest.raises(KiwiJsonError, match="date_as_unix_time can't be used"):
+        JSONExtension(Flask(__name__), encoder=str, date_as_unix_time=True)
+
+
+def test_response_compact():
+    app = Flask(__name__)
+    JSONExtension(app)
+    app.json.compact = False
+    with app.app_context():
+        assert jsonify(a=[1]).get_data() == b'{\n  "a": [\n    1\n  ]\n}\n'
+
+
+def test_request_loads():
+    app = Flask(__name__)
+    JSONExtension(app)
+
+    @app.route("/", methods=["POST"])
+    def echo():
+        return jsonify(request.get_json())
+
+    response = app.test_client().post("/", json={"a": "č"})
+    assert response.get_json() == {"a": "č"}
+    with app.app_context():
+        assert json.loads(memoryview(b'{"a": 1}')) == {"a": 1}
+
+
+def test_provider_options():
+    app = Flask(__name__)
+    JSONExtension(
+        app,
+        cls=MaskedJSONEncoder,
+        recursive=True,
+        date_as_unix_time=True,
+        precision=1,
+    )
+    with app.app_context():
+        response = jsonify(
+            {"at": datetime.date(2018, 1, 1), "user": {"token": "x"}, "price": 1.25}
+        )
+        assert response.get_data() == (
+            b'{"at":1514764800,"price":1.2,"user":{"token":"-- MASKED --"}}\n'
+        )
+        # The options are of the responses only
+        assert json.dumps({"price": 1.25, "token": "x"}) == (
+            '{"price": 1.25, "token": "x"}'
+        )
+        assert json.dumps([1], indent=2) == "[\n  1\n]"
+
+
+def test_provider_session():
+    app = Flask(__name__)
+    app.secret_key = "secret"
+    JSONExtension(app, cls=MaskedJSONEncoder, recursive=True, precision=1)
+
+    @app.route("/set")
+    def set_session():
+        session["token"] = "x"
+        session["price"] = Decimal("1.25")
+        session["at"] = datetime.date(2018, 1, 1)
+        return "ok"
+
+    @app.route("/get")
+    def get_session():
+        return f"{session['token']} {session['price']} {session['at']}"
+
+    client = app.test_client()
+    client.get("/set")
+    assert client.get("/get").data == b"x 1.25 2018-01-01"
+
+
+def test_provider_reuses_encoders():
+    app = Flask(__name__)
+    JSONExtension(app)
+    encoder = app.json.get_encoder("compact")
+    with app.app_context():
+        jsonify(a=1)
+        assert app.json.get_encoder("compact") is encoder
+        app.json.sort_keys = False
+        assert jsonify(b=1, a=1).get_data() == b'{"b":1,"a":1}\n'
+    assert app.json.get_encoder("compact") is not encoder
+
+
+def test_response_streamed():
+    app = Flask(__name__)
+    JSONExtension(app, stream_threshold=3, date_as_unix_time=True)
+
+    @app.route("/<int:count>")
+    def index(count):
+        return jsonify([datetime.date(2018, 1, 1)] * count)
+
+    @app.route("/generator")
+    def generator():
+        return jsonify(i for i in range(3))
+
+    client = app.test_client()
+    small = client.get("/2")
+    assert small.content_length == len(small.data)
+    assert small.data == b"[1514764800,1514764800]\n"
+    large = client.get("/3")
+    assert large.content_length is None
+    assert large.data == b"[1514764800,1514764800,1514764800]\n"
+    assert large.mimetype == "application/json"
+    assert client.get("/generator").data == b"[0,1,2]\n"
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+import pytest
+
+import kw.json
+
+
+def imported_modules(statement):
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, stdout=subprocess.PIPE, text=True
+    ).stdout
+    return set(output.split())
+
+
+@pytest.mark.parametrize(
+    "statement, not_imported",
+    (
+        ("import kw.json", {"json", "simplejson", "orjson", "kw.json.encode"}),
+        (
+            "from kw.json import dumps; dumps({'a': [1]})",
+            {"attr", "dataclasses", "flask", "orjson", "concurrent.futures", "uuid"},
+        ),
+    ),
+)
+def test_import_is_lazy(statement, not_imported):
+    assert not imported_modules(statement) & not_imported
+
+
+def test_lazy_attributes():
+    assert kw.json.dumps({"a": 1}) == '{"a": 1}'
+    assert "dumps" in dir(kw.json)
+    assert set(kw.json.__all__) <= set(dir(kw.json))
+    for name in kw.json.__all__:
+        assert getattr(kw.json, name) is not None
+    with pytest.raises(AttributeError, match="has no attribute 'foo'"):
+        kw.json.foo  # pylint: disable=pointless-statement
@@ -0,0 +1,129 @@
+import datetime
+import io
+from dataclasses import dataclass
+from decimal import Decimal
+
+import pytest
+
+from kw.json import (
+    MaskedJSONEncoder,
+    dump_lines,
+    dumps_lines,
+    iterdumps_lines,
+    load_lines,
+)
+from kw.json.exceptions import KiwiJsonError
+
+
+@dataclass
+class DataclassItem:
+    attrib: int
+
+
+@dataclass
+class Event:
+    id: int
+    at: datetime.date
+
+
+RECORDS = [
+    {"id": 1, "at": datetime.date(2018, 1, 1), "price": 1.333},
+    {"id": 2, "item": DataclassItem(attrib=1), "secret": "FOO"},
+    [1, "two"],
+]
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    (
+        (
+            {},
+            '{"id": 1, "at": "2018-01-01", "price": 1.333}\n'
+            '{"id": 2, "item": {"attrib": 1}, "secret": "FOO"}\n'
+            '[1, "two"]\n',
+        ),
+        (
+            {"precision": 2, "date_as_unix_time": True},
+            '{"id": 1, "at": 1514764800, "price": 1.33}\n'
+            '{"id": 2, "item": {"attrib": 1}, "secret": "FOO"}\n'
+            '[1, "two"]\n',
+        ),
+        (
+            {"cls": MaskedJSONEncoder, "separators": (",", ":")},
+            '{"id":1,"at":"2018-01-01","price":1.333}\n'
+            '{"id":2,"item":{"attrib":1},"secret":"-- MASKED --"}\n'
+            '[1,"two"]\n',
+        ),
+    ),
+)
+def test_dumps_lines(kwargs, expected):
+    assert dumps_lines(iter(RECORDS), **kwargs) == expected
+
+
+def test_dumps_lines_empty():
+    assert dumps_lines([]) == ""
+
+
+def test_dumps_lines_indent():
+    with pytest.raises(KiwiJsonError, match="indent"):
+        dumps_lines(RECORDS, indent=2)
+
+
+def test_iterdumps_lines_chunks():
+    chunks = list(iterdumps_lines(({"id": i} for i in range(1000)), chunk_size=100))
+
+    assert len(chunks) > 50
+    assert all(chunk.endswith("\n") for chunk in chunks)
+    assert list(load_lines(io.StringIO("".join(chunks)))) == [
+        {"id": i} for i in range(1000)
+    ]
+
+
+def test_dumps_lines_workers():
+    records = [{"id": i, "at": datetime.date(2018, 1, 1)} for i in range(100)]
+
+    assert dumps_lines(records, workers=2, batch_size=7) == dumps_lines(records)
+
+
+def test_dump_lines(tmpdir):
+    filename = str(tmpdir.join("test_file.jsonl"))
+    with open(filename, "w+", encoding="UTF-8") as fp:
+        dump_lines(RECORDS, fp, precision=1)
+        fp.seek(0, 0)
+        assert list(load_lines(fp)) == [
+            {"id": 1, "at": "2018-01-01", "price": 1.3},
+            {"id": 2, "item": {"attrib": 1}, "secret": "FOO"},
+            [1, "two"],
+        ]
+
+
+def test_load_lines_binary():
+    fp = io.BytesIO(b'{"a": "\xc3\xa1"}\n\n[1]\n')
+    assert list(load_lines(fp)) == [{"a": "á"}, [1]]
+
+
+def test_load_lines_use_decimal():
+    fp = io.StringIO('{"num": 0.1}\n')
+    assert list(load_lines(fp, use_decimal=True)) == [{"num": Decimal("0.1")}]
+
+
+def test_load_lines_decoder_arguments():
+    lines = '{"id": 1, "at": "2018-01-01"}\n\n{"id": 2, "at": "2018-01-02"}\n'
+
+    assert list(load_lines(io.StringIO(lines), Event)) == [
+        Event(id=1, at=datetime.date(2018, 1, 1)),
+        Event(id=2, at=datetime.date(2018, 1, 2)),
+    ]
+    assert list(load_lines(io.StringIO(lines), converters={"at": datetime.date})) == [
+        {"id": 1, "at": datetime.date(2018, 1, 1)},
+        {"id": 2, "at": datetime.date(2018, 1, 2)},
+    ]
+    assert list(load_lines(io.BytesIO(lines.encode()), select=["id"])) == [
+        {"id": 1},
+        {"id": 2},
+    ]
+
+
+def test_dumps_lines_use_decimal():
+    records = [{"num": Decimal("0.1")}, [Decimal("1E+3")]]
+    assert dumps_lines(records, use_decimal=True) == '{"num": 0.1}\n[1E+3]\n'
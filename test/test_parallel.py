@@ -0,0 +1,126 @@
+import datetime
+import multiprocessing
+from decimal import Decimal
+
+import pytest
+
+from kw.json import Encoder, MaskedJSONEncoder, dumps, dumps_lines, register_encoder
+from kw.json._compat import simplejson_available
+from kw.json.parallel import _separators, _sort_key, _split, make_pool
+
+RECORDS = [
+    {
+        "id": i,
+        "password": "secret",
+        "date": datetime.date(2018, 1, i % 28 + 1),
+        "price": i / 3,
+        "fare": {"amount": Decimal(i), "tags": ["a", "b"]},
+    }
+    for i in range(100)
+]
+
+
+class Money:
+    def __init__(self, amount, currency):
+        self.amount = amount
+        self.currency = currency
+
+
+def encode_money(obj):
+    return f"{obj.amount} {obj.currency}"
+
+
+@pytest.fixture
+def spawn():
+    method = multiprocessing.get_start_method()
+    multiprocessing.set_start_method("spawn", force=True)
+    yield
+    multiprocessing.set_start_method(method, force=True)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    (
+        {},
+        {"indent": 2},
+        {"indent": 4, "sort_keys": True},
+        {"separators": (",", ":")},
+        {"precision": 1, "date_as_unix_time": True},
+        {"cls": MaskedJSONEncoder},
+        {"cls": MaskedJSONEncoder, "recursive": True},
+    ),
+)
+def test_dumps_workers(kwargs):
+    objects = (
+        RECORDS,
+        tuple(RECORDS),
+        {f"key{i}": record for i, record in enumerate(RECORDS)},
+        {"password": "secret", "rows": RECORDS, "count": 100},
+    )
+    for obj in objects:
+        assert dumps(obj, workers=2, **kwargs) == dumps(obj, **kwargs)
+
+
+def test_dumps_workers_orjson():
+    pytest.importorskip("orjson")
+    for kwargs in ({}, {"indent": 2}):
+        expected = dumps(RECORDS, backend="orjson", **kwargs)
+        assert dumps(RECORDS, workers=2, backend="orjson", **kwargs) == expected
+
+
+@pytest.mark.parametrize("obj", (1, "a", [], [1], {}, {"a": [1, 2]}, [[], {}]))
+def test_dumps_workers_small(obj):
+    assert dumps(obj, workers=2) == dumps(obj)
+
+
+def test_encoder_workers():
+    encoder = Encoder(precision=2)
+    assert encoder.dumps(RECORDS, workers=2) == encoder.dumps(RECORDS)
+
+
+def test_dumps_workers_sort_keys():
+    value = {i: str(i) for i in reversed(range(100))}
+    assert dumps(value, workers=2, sort_keys=True) == dumps(value, sort_keys=True)
+
+
+@pytest.mark.skipif(not simplejson_available, reason="simplejson only")
+def test_dumps_workers_sort_mixed_keys():
+    value = {**{i: i for i in range(50)}, **{str(i * 7): i for i in range(50)}}
+    value.update({1.5: 1, None: 2, True: 3})
+    assert dumps(value, workers=2, sort_keys=True) == dumps(value, sort_keys=True)
+
+
+def test_workers_registrations(registry, spawn):
+    register_encoder(Money, encode_money)
+    value = [Money(i, "EUR") for i in range(20)]
+    assert dumps(value, workers=2) == dumps(value)
+    assert dumps_lines(value, workers=2, batch_size=5) == dumps_lines(value)
+
+
+def test_workers_unpicklable_registrations(registry, spawn):
+    register_encoder(Money, lambda obj: obj.amount)
+    assert make_pool(2) is None
+    value = [Money(i, "EUR") for i in range(20)]
+    assert dumps(value, workers=2) == dumps(value)
+    assert dumps_lines(value, workers=2, batch_size=5) == dumps_lines(value)
+
+
+def test_split():
+    assert list(_split([1, 2, 3], 2)) == [[1, 2], [3]]
+    assert list(_split((1, 2, 3), 3)) == [[1, 2, 3]]
+    assert list(_split({"b": 1, "a": 2, "c": 3}, 2, _sort_key("json"))) == [
+        {"a": 2, "b": 1},
+        {"c": 3},
+    ]
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    (
+        ({}, ("", ", ", "")),
+        ({"separators": (",", ":")}, ("", ",", "")),
+        ({"indent": 2}, ("\n  ", ",\n  ", "\n")),
+    ),
+)
+def test_separators(kwargs, expected):
+    assert _separators(dumps([0, 0], **kwargs)) == expected
@@ -0,0 +1,104 @@
+import io
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import List, Optional
+
+import pytest
+
+from kw.json import Decoder, dumps, load, loads
+from kw.json._compat import JSONDecodeError
+
+DOCUMENT = dumps(
+    {
+        "data": [
+            {"price": 1.5, "name": "a [b] {c}", "route": [{"to": "BCN"}]},
+            {"price": 2, "name": 'quoted \\" ] }', "route": []},
+        ],
+        "meta": {"count": 2, "next": None},
+        "skipped": [[[[]]], {"a": {"b": [True, False, None, -1.5e3]}}],
+    }
+)
+
+
+@pytest.mark.parametrize(
+    "select, expected",
+    (
+        (
+            ["data.*.price", "meta.count"],
+            {"data": [{"price": 1.5}, {"price": 2}], "meta": {"count": 2}},
+        ),
+        (["meta"], {"meta": {"count": 2, "next": None}}),
+        (["meta", "meta.count"], {"meta": {"count": 2, "next": None}}),
+        (["data.1.name"], {"data": [{"name": 'quoted \\" ] }'}]}),
+        (["data.*.route.*.to"], {"data": [{"route": [{"to": "BCN"}]}, {"route": []}]}),
+        (["*.next"], {"data": [], "meta": {"next": None}, "skipped": []}),
+        (["skipped.1.a.b"], {"skipped": [{"a": {"b": [True, False, None, -1500.0]}}]}),
+        (["missing.key"], {}),
+        ([], {}),
+    ),
+)
+def test_select(select, expected):
+    assert loads(DOCUMENT, select=select) == expected
+
+
+@pytest.mark.parametrize("document", (DOCUMENT.encode(), bytearray(DOCUMENT.encode())))
+def test_select_bytes(document):
+    assert loads(document, select=["meta.count"]) == {"meta": {"count": 2}}
+    assert loads(memoryview(document), select=["meta.count"]) == {"meta": {"count": 2}}
+
+
+def test_select_scalar_document():
+    assert loads(" 1 ", select=["a"]) is None
+    assert loads("[1, 2, 3]", select=["2"]) == [3]
+
+
+def test_select_hooks():
+    document = '{"a": {"price": 1.1, "b": 1}, "c": [{"price": 2.2}]}'
+    assert loads(document, select=["a.price"], use_decimal=True) == {
+        "a": {"price": Decimal("1.1")}
+    }
+    assert loads(document, select=["c"], converters={"price": Decimal}) == {
+        "c": [{"price": Decimal("2.2")}]
+    }
+    assert loads(document, select=["a.b"], object_pairs_hook=list) == [
+        ("a", [("b", 1)])
+    ]
+
+
+@dataclass
+class Item:
+    price: Decimal
+    name: Optional[str] = None
+
+
+@dataclass
+class Page:
+    data: List[Item]
+
+
+def test_select_schema():
+    decoder = Decoder(Page, select=["data.*.price"])
+    assert decoder.loads(DOCUMENT) == Page([Item(Decimal("1.5")), Item(Decimal("2"))])
+    assert decoder.load(io.StringIO(DOCUMENT)) == decoder.loads(DOCUMENT)
+    assert load(io.StringIO(DOCUMENT), select=["meta.count"]) == {"meta": {"count": 2}}
+
+
+@pytest.mark.parametrize(
+    "document",
+    (
+        "",
+        "{",
+        '{"a" 1}',
+        '{"a": 1',
+        '{"a": 1 "b": 2}',
+        '{"a": [1, 2}',
+        '{"a": {"b": 1}} x',
+        '{"a": ',
+        '{"b": [1}',
+        "[1 2]",
+        "{1: 2}",
+    ),
+)
+def test_select_invalid(document):
+    with pytest.raises(JSONDecodeError):
+        loads(document, select=["a"])
@@ -0,0 +1,121 @@
+from collections import namedtuple
+from json import dumps as json_dumps
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from kw.json import MaskedJSONEncoder, default_encoder, dumps, encode_rows, mask_dict
+from kw.json.utils import mask_dict_factory
+
+
+class Record:
+    """Stand-in for `asyncpg.Record`, iterating over values and having `keys()`."""
+
+    def __init__(self, **values):
+        self._values = values
+
+    def keys(self):
+        return iter(self._values)
+
+    def __iter__(self):
+        return iter(self._values.values())
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+
+Row = namedtuple("Row", ["id", "name", "password"])
+
+
+@pytest.fixture
+def connection():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.connect() as connection:
+        connection.execute(
+            text("CREATE TABLE users (id INTEGER, name TEXT, password TEXT)")
+        )
+        connection.execute(
+            text("INSERT INTO users VALUES (1, 'John', 'x'), (2, 'Jane', 'y')")
+        )
+        yield connection
+
+
+SELECT = text("SELECT * FROM users ORDER BY id")
+EXPECTED = [
+    {"id": 1, "name": "John", "password": "x"},
+    {"id": 2, "name": "Jane", "password": "y"},
+]
+EXPECTED_COLUMNAR = {
+    "columns": ["id", "name", "password"],
+    "rows": [[1, "John", "x"], [2, "Jane", "y"]],
+}
+EXPECTED_MASKED = [
+    {"id": 1, "name": "John", "password": "-- MASKED --"},
+    {"id": 2, "name": "Jane", "password": "-- MASKED --"},
+]
+
+
+@pytest.mark.parametrize(
+    "rows",
+    (
+        [
+            Record(id=1, name="John", password="x"),
+            Record(id=2, name="Jane", password="y"),
+        ],
+        [Row(1, "John", "x"), Row(2, "Jane", "y")],
+        iter([Row(1, "John", "x"), Row(2, "Jane", "y")]),
+        EXPECTED,
+    ),
+)
+def test_encode_rows(rows):
+    rows = list(rows)
+    assert encode_rows(rows) == EXPECTED
+    assert encode_rows(iter(rows), columnar=True) == EXPECTED_COLUMNAR
+    assert encode_rows(rows, dict_factory=mask_dict) == EXPECTED_MASKED
+    assert encode_rows(rows, columnar=True, dict_factory=mask_dict)["rows"] == [
+        [1, "John", "-- MASKED --"],
+        [2, "Jane", "-- MASKED --"],
+    ]
+
+
+def test_encode_rows_sqlalchemy(connection):
+    assert encode_rows(connection.execute(SELECT).fetchall()) == EXPECTED
+    assert encode_rows(connection.execute(SELECT), columnar=True) == EXPECTED_COLUMNAR
+    assert encode_rows(connection.execute(SELECT).mappings()) == EXPECTED
+
+
+def test_encode_rows_empty(connection):
+    assert encode_rows([]) == []
+    assert encode_rows([], columnar=True) == {"columns": [], "rows": []}
+    empty = connection.execute(text("SELECT * FROM users WHERE id > 2"))
+    assert encode_rows(empty, columnar=True) == {
+        "columns": ["id", "name", "password"],
+        "rows": [],
+    }
+
+
+def test_encode_rows_single_column():
+    assert encode_rows([{"id": 1}], columnar=True)["rows"] == [[1]]
+
+
+def test_encode_rows_dict_factory():
+    mask_name = mask_dict_factory(blacklist=("name",))
+    assert encode_rows([Row(1, "John", "x")], dict_factory=mask_name) == [
+        {"id": 1, "name": "-- MASKED --", "password": "x"}
+    ]
+    assert encode_rows([Row(1, "John", "x")], dict_factory=list) == [
+        [("id", 1), ("name", "John"), ("password", "x")]
+    ]
+
+
+def test_result_default_encoder(connection):
+    assert json_dumps(
+        connection.execute(SELECT), default=default_encoder
+    ) == json_dumps(EXPECTED)
+    assert dumps(connection.execute(SELECT), cls=MaskedJSONEncoder) == json_dumps(
+        EXPECTED_MASKED
+    )
+
+
+def test_legacy_row(connection):
+    assert dumps(connection.execute(SELECT).fetchall()) == json_dumps(EXPECTED)
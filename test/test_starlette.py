@@ -0,0 +1,90 @@
+import asyncio
+import datetime
+from dataclasses import dataclass
+from decimal import Decimal
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from kw.json import MaskedJSONEncoder
+from kw.json.starlette import (
+    DEFAULT_OPTIONS,
+    KiwiJSONResponse,
+    KiwiJSONStreamingResponse,
+)
+
+
+@dataclass
+class Booking:
+    id: int
+    price: Decimal
+    created: datetime.date
+
+
+class MaskedResponse(KiwiJSONResponse):
+    options = {**DEFAULT_OPTIONS, "cls": MaskedJSONEncoder, "date_as_unix_time": True}
+
+
+def make_client(response):
+    async def endpoint(request):  # pylint: disable=unused-argument
+        return response
+
+    return TestClient(Starlette(routes=[Route("/", endpoint)]))
+
+
+def test_response():
+    booking = Booking(1, Decimal("1.5"), datetime.date(2018, 1, 1))
+    response = make_client(KiwiJSONResponse({"booking": booking, "city": "Brno ✈"}))
+    result = response.get("/")
+    assert (
+        result.content
+        == (
+            '{"booking":{"id":1,"price":"1.5","created":"2018-01-01"},"city":"Brno ✈"}'
+        ).encode()
+    )
+    assert result.headers["content-type"] == "application/json"
+    assert result.headers["content-length"] == str(len(result.content))
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf")])
+def test_response_not_finite(value):
+    with pytest.raises(ValueError, match="Out of range float values"):
+        KiwiJSONResponse({"price": value})
+
+
+def test_response_options():
+    response = MaskedResponse(
+        {"token": "x", "at": datetime.date(2018, 1, 1)}, status_code=201
+    )
+    result = make_client(response).get("/")
+    assert result.status_code == 201
+    assert result.json() == {"token": "-- MASKED --", "at": 1514764800}
+
+
+def test_streaming_response():
+    rows = ({"id": i, "at": datetime.date(2018, 1, 1)} for i in range(1000))
+    response = KiwiJSONStreamingResponse({"rows": rows}, chunk_size=1024)
+    result = make_client(response).get("/")
+    assert result.headers["content-type"] == "application/json"
+    assert "content-length" not in result.headers
+    assert result.json() == {
+        "rows": [{"id": i, "at": "2018-01-01"} for i in range(1000)]
+    }
+
+
+@pytest.mark.usefixtures("event_loop_restored")
+def test_streaming_response_chunks():
+    data = [{"id": i} for i in range(1000)]
+    response = KiwiJSONStreamingResponse(
+        data, media_type="application/x-json", chunk_size=64
+    )
+    assert response.media_type == "application/x-json"
+
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+
+    chunks = asyncio.run(collect())
+    assert len(chunks) > 1
+    assert b"".join(chunks) == KiwiJSONResponse(data).body
@@ -0,0 +1,161 @@
+import datetime
+from collections import namedtuple
+from dataclasses import dataclass
+from decimal import Decimal
+from functools import partial
+
+import pytest
+
+from kw.json import (
+    MaskedJSONEncoder,
+    collect_stats,
+    default_encoder,
+    disable_stats,
+    dumps,
+    enable_stats,
+    encode_rows,
+    get_stats,
+    mask_dict,
+    raw_encoder,
+    register_fields,
+)
+from kw.json.stats import EncodingStats
+
+
+class Unknown:
+    pass
+
+
+@dataclass
+class Account:
+    login: str
+    pin: str
+    password: str
+
+
+Row = namedtuple("Row", ["id", "token"])
+
+
+@pytest.fixture(autouse=True)
+def _disabled():
+    yield
+    disable_stats()
+
+
+def test_default_encoder_calls():
+    with collect_stats() as stats:
+        dumps([datetime.date(2018, 1, 1)] * 3 + [Decimal("1.5")], timespec="seconds")
+    assert stats.calls == {
+        ("default_encoder", datetime.date): 3,
+        ("default_encoder", Decimal): 1,
+    }
+    assert stats.time["default_encoder", datetime.date] > 0
+    assert {row[:3] for row in stats.top()} == {
+        ("default_encoder", datetime.date, 3),
+        ("default_encoder", Decimal, 1),
+    }
+    assert len(stats.top(1)) == 1
+
+
+def test_failed_calls_recorded():
+    with collect_stats() as stats:
+        with pytest.raises(TypeError):
+            dumps(Unknown())
+    assert stats.calls == {("default_encoder", Unknown): 1}
+    assert not stats.repr_fallbacks
+
+
+def test_repr_fallbacks():
+    with collect_stats() as stats:
+        dumps([Unknown(), Unknown(), 1], default=raw_encoder)
+    assert stats.repr_fallbacks == {Unknown: 2}
+    assert stats.calls == {("default_encoder", Unknown): 2}
+
+
+def test_masked_keys():
+    with collect_stats() as stats:
+        result = mask_dict({"password": "x", "token": "y", "name": "z"})
+        mask_dict([("password", "x")])
+        dumps({"secret": 1, "nested": {"password": 2}}, cls=MaskedJSONEncoder)
+    assert result == {"password": "-- MASKED --", "token": "-- MASKED --", "name": "z"}
+    assert stats.masked_keys == {"password": 2, "token": 1, "secret": 1}
+    assert stats.calls == {("mask_dict", dict): 2, ("mask_dict", list): 1}
+
+
+def test_masked_keys_encoding_paths(field_options):
+    register_fields(Account, mask=["pin"])
+    account = Account(login="a", pin="1", password="x")
+    rows = [Row(1, "x"), Row(2, "y")]
+    with collect_stats() as stats:
+        dumps(
+            [{"secret": 1}, {"nested": {"token": 2, "password": 3}}],
+            cls=MaskedJSONEncoder,
+            recursive=True,
+        )
+        dumps(
+            {"nested": {"password": 3}, "items": [1.5]},
+            cls=MaskedJSONEncoder,
+            recursive=True,
+            precision=1,
+        )
+    assert stats.masked_keys == {"secret": 1, "token": 1, "password": 2}
+
+    with collect_stats() as stats:
+        dumps([account], cls=MaskedJSONEncoder)
+        dumps(account)
+    assert stats.masked_keys == {"pin": 2, "password": 1}
+
+    with collect_stats() as stats:
+        encode_rows(rows, dict_factory=mask_dict)
+        encode_rows(rows, columnar=True, dict_factory=mask_dict)
+    assert stats.masked_keys == {"token": 4}
+
+
+def test_as_dict():
+    with collect_stats() as stats:
+        dumps({"token": Unknown()}, cls=MaskedJSONEncoder)
+        dumps([Unknown()], default=raw_encoder)
+    result = stats.as_dict()
+    assert result["default_encoder"] == {
+        "test.test_stats.Unknown": {
+            "calls": 1,
+            "time": stats.time["default_encoder", Unknown],
+        }
+    }
+    assert result["mask_dict"]["builtins.dict"]["calls"] == 1
+    assert result["masked_keys"] == {"token": 1}
+    assert result["repr_fallbacks"] == {"test.test_stats.Unknown": 1}
+    dumps(result)
+
+
+def test_disabled():
+    assert get_stats() is None
+    stats = enable_stats()
+    assert get_stats() is stats
+    dumps(datetime.date(2018, 1, 1))
+    assert disable_stats() is stats
+    dumps(datetime.date(2018, 1, 1))
+    mask_dict({"password": 1})
+    assert stats.calls == {("default_encoder", datetime.date): 1}
+    assert get_stats() is None
+
+
+def test_nested_collection():
+    outer = enable_stats(EncodingStats())
+    with collect_stats() as inner:
+        dumps(Decimal(1))
+    assert get_stats() is outer
+    dumps(Decimal(1))
+    assert inner.calls == outer.calls == {("default_encoder", Decimal): 1}
+
+
+def test_disabled_while_encoding():
+    def date_encoder(obj):  # pylint: disable=unused-argument
+        disable_stats()
+        return "date"
+
+    stats = enable_stats()
+    default = partial(default_encoder, date_encoder=date_encoder)
+    value = [datetime.date(2018, 1, 1), Decimal(1)]
+    assert dumps(value, default=default) == '["date", "1"]'
+    assert stats.calls == {("default_encoder", datetime.date): 1}
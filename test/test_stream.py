@@ -0,0 +1,176 @@
+import io
+import json
+import mmap
+from dataclasses import dataclass
+from decimal import Decimal
+
+import pytest
+
+from kw.json import Decoder, dumps, iterload
+from kw.json._compat import JSONDecodeError
+
+DOCUMENT = dumps(
+    {
+        "meta": {"count": 3, "items": ["not", "these"]},
+        "items": {"item": [{"id": 1, "price": 1.5}, {"id": 2, "price": 2.25}, 3]},
+        "tail": [[1, 2], {"a": "]}"}],
+    },
+    indent=2,
+)
+
+
+@pytest.mark.parametrize("read_size", (1, 2, 7, 1024))
+@pytest.mark.parametrize("binary", (False, True))
+def test_iterload(read_size, binary):
+    fp = io.BytesIO(DOCUMENT.encode()) if binary else io.StringIO(DOCUMENT)
+    assert list(iterload(fp, "items.item.item", read_size=read_size)) == [
+        {"id": 1, "price": 1.5},
+        {"id": 2, "price": 2.25},
+        3,
+    ]
+
+
+@pytest.mark.parametrize("read_size", range(1, 12))
+def test_iterload_numbers_cut_by_reads(read_size):
+    numbers = [1.5, -2.25e10, 3e-5, 0.125, 1e5, 12345]
+    document = dumps({"items": numbers, "x": {"b": 1.5, "c": [1e-3]}})
+    fp = io.StringIO(document)
+    assert list(iterload(fp, "items.item", read_size=read_size)) == numbers
+    fp = io.StringIO(document)
+    assert list(iterload(fp, "x.c.item", read_size=read_size)) == [1e-3]
+
+
+@pytest.mark.parametrize("cut", range(1, 52))
+def test_iterload_cut_anywhere(cut):
+    document = b'{"items": [1, {"a": 2}], "x": {"b": 1.5, "c": [1]}}'
+
+    class Reader:
+        def __init__(self):
+            self.chunks = [document[:cut], document[cut:]]
+
+        def read(self, size):  # pylint: disable=unused-argument
+            return self.chunks.pop(0) if self.chunks else b""
+
+    assert list(iterload(Reader(), "items.item")) == [1, {"a": 2}]
+    assert list(iterload(Reader(), "x.b")) == [1.5]
+
+
+@pytest.mark.parametrize(
+    "document, prefix, expected",
+    (
+        ("[1, 22, 333, [4444]]", "item", [1, 22, 333, [4444]]),
+        ("[[1, 2], [3], 4]", "item.item", [1, 2, 3]),
+        ('{"a": {"b": 12345}}', "a.b", [12345]),
+        ('{"a": {"b": 12345}}', "a", [{"b": 12345}]),
+        ('{"a": 1}', "b", []),
+        ('{"a": 1}', "a.item", []),
+        ("[]", "item", []),
+        ("{}", "a", []),
+        ("  ", "", []),
+        ('{"a": 1}\n\n{"a": 2}\n', "", [{"a": 1}, {"a": 2}]),
+        ('{"a": [1]}\n{"a": [2, 3]}', "a.item", [1, 2, 3]),
+        ('"\\u010d" 1.5e3 null', "", ["č", 1500.0, None]),
+    ),
+)
+def test_iterload_prefix(document, prefix, expected):
+    assert list(iterload(io.StringIO(document), prefix, read_size=2)) == expected
+
+
+def test_iterload_multibyte():
+    document = dumps(["čšř" * 10, "🥝"], ensure_ascii=False).encode()
+    assert list(iterload(io.BytesIO(document), "item", read_size=1)) == [
+        "čšř" * 10,
+        "🥝",
+    ]
+
+
+def test_iterload_mmap(tmp_path):
+    path = tmp_path / "document.json"
+    path.write_text(DOCUMENT)
+    with path.open("rb") as fp, mmap.mmap(
+        fp.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        assert [item["id"] for item in list(iterload(mm, "items.item.item"))[:2]] == [
+            1,
+            2,
+        ]
+
+
+def test_iterload_is_incremental():
+    fp = io.StringIO(dumps({"items": [{"id": i} for i in range(1000)]}))
+    items = iterload(fp, "items.item", read_size=100)
+    assert next(items) == {"id": 0}
+    assert fp.tell() <= 200
+    assert sum(1 for _ in items) == 999
+
+
+@dataclass
+class Item:
+    id: int
+    price: Decimal
+
+
+def test_iterload_hooks():
+    def items(**kwargs):
+        return list(iterload(io.StringIO(DOCUMENT), "items.item.item", **kwargs))
+
+    assert items(use_decimal=True)[1] == {"id": 2, "price": Decimal("2.25")}
+    assert items(converters={"price": Decimal})[0] == {"id": 1, "price": Decimal("1.5")}
+    assert items(select=["price"]) == [{"price": 1.5}, {"price": 2.25}, None]
+    decoder = Decoder(Item, select=["id", "price"])
+    assert list(decoder.iterload(io.StringIO(DOCUMENT), "items.item.item"))[:2] == [
+        Item(1, Decimal("1.5")),
+        Item(2, Decimal("2.25")),
+    ]
+
+
+@pytest.mark.parametrize(
+    "document",
+    (
+        "[1, 2",
+        "[1, 2,",
+        "[1 2]",
+        '{"items": [1}',
+        '{"items" [1]}',
+        "{items: [1]}",
+        '{"a": [1, 2}, "items": []}',
+        '{"items": ["abc',
+        "[1] x",
+    ),
+)
+def test_iterload_invalid(document):
+    with pytest.raises(JSONDecodeError):
+        list(iterload(io.StringIO(document), "items.item", read_size=2))
+
+
+def test_iterload_invalid_reads_little():
+    document = '{"items": [1 2, ' + ", ".join(["12345"] * 100000) + "]}"
+    fp = io.StringIO(document)
+    with pytest.raises(JSONDecodeError):
+        list(iterload(fp, "items.item", read_size=100))
+    assert fp.tell() <= 200
+
+
+@pytest.mark.parametrize(
+    "document",
+    (
+        '{\n  "items": [\n    1,\n    2 3\n  ]\n}',
+        '{"items": [1, 2, {"a": 1 "b": 2}]}',
+        '{\n  "items": [\n    "abc",\n    tru\n  ]\n}',
+        '{"x": "' + "a" * 50 + '",\n "items": [1, 2] "y": 1}',
+    ),
+)
+@pytest.mark.parametrize("read_size", (1, 7, 1024))
+def test_iterload_invalid_position(document, read_size):
+    # The standard json, its error is a ValueError even with simplejson installed
+    with pytest.raises(ValueError) as expected:
+        json.loads(document)
+    with pytest.raises(JSONDecodeError) as error:
+        list(iterload(io.StringIO(document), "items.item", read_size=read_size))
+    assert (error.value.pos, error.value.lineno, error.value.colno) == (
+        expected.value.pos,
+        expected.value.lineno,
+        expected.value.colno,
+    )
+    # The messages of simplejson differ a bit
+    assert str(error.value).endswith(str(expected.value).rsplit(":", 1)[1])
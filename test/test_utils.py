@@ -33,3 +33,49 @@ def test_mask_dict(value, expected):
 def test_mask_dict_factory(blacklist, whitelist, value, expected):
     my_mask_dict = mask_dict_factory(blacklist=blacklist, whitelist=whitelist)
     assert my_mask_dict(value) == expected
+
+
+@pytest.mark.parametrize(
+    "blacklist, whitelist, value, expected",
+    (
+        (
+            frozenset(["secret"]),
+            frozenset(),
+            {"SECRET": 1, "My_Secret_Value": 2, "secrets": 3, "secre": 4},
+            {
+                "SECRET": "-- MASKED --",
+                "My_Secret_Value": "-- MASKED --",
+                "secrets": "-- MASKED --",
+                "secre": 4,
+            },
+        ),
+        (
+            frozenset(["a.b", "c|d"]),
+            frozenset(),
+            {"a.b": 1, "axb": 2, "c|d": 3, "c": 4},
+            {"a.b": "-- MASKED --", "axb": 2, "c|d": "-- MASKED --", "c": 4},
+        ),
+        (
+            frozenset(["token"]),
+            frozenset(["booking_token"]),
+            {"Booking_Token": 1, "booking_token_v2": 2},
+            {"Booking_Token": 1, "booking_token_v2": "-- MASKED --"},
+        ),
+    ),
+)
+def test_mask_dict_factory_matching(blacklist, whitelist, value, expected):
+    my_mask_dict = mask_dict_factory(blacklist=blacklist, whitelist=whitelist)
+    # The second pass is served from the verdict cache
+    assert my_mask_dict(value) == expected
+    assert my_mask_dict(value) == expected
+
+
+@pytest.mark.parametrize("cache_size", (0, 1, None))
+def test_mask_dict_factory_cache_size(cache_size):
+    my_mask_dict = mask_dict_factory(placeholder="***", cache_size=cache_size)
+    for _ in range(2):
+        assert my_mask_dict({"password": 1, "user": 2, "api_key": 3}) == {
+            "password": "***",
+            "user": 2,
+            "api_key": "***",
+        }